@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Audio Capture
+One long-lived microphone input stream read by a background thread into a
+frame buffer, exposed to SpeechRecognition as an AudioSource
+"""
+import logging
+import threading
+from collections import deque
+try:
+    import speech_recognition as sr
+except Exception:
+    sr = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_AudioSourceBase = sr.AudioSource if sr is not None else object
+
+
+class BufferedSource(_AudioSourceBase):
+    """AudioSource whose stream reads frames from an AudioCapture buffer.
+
+    Entering and leaving it is free, so phrases can be read from it in a
+    loop without touching the device."""
+
+    def __init__(self, capture):
+        self.capture = capture
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = capture.sample_width
+        self.CHUNK = capture.chunk
+        self.stream = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def read(self, size):
+        """Next ``size`` frames of audio, like every AudioSource stream; empty once capture has stopped"""
+        return self.capture.read(size)
+
+
+class AudioCapture:
+    """Keeps a microphone open and buffers its frames continuously.
+
+    ``start()``/``stop()`` are reference counted so overlapping listening
+    loops share the device. The buffer holds ``max_buffer_seconds`` of
+    audio; if the consumer falls further behind the oldest frames are
+    dropped and counted."""
+
+    def __init__(self, microphone, max_buffer_seconds=30.0):
+        self.microphone = microphone
+        self.max_buffer_seconds = max_buffer_seconds
+        self.sample_rate = getattr(microphone, 'SAMPLE_RATE', 16000)
+        self.sample_width = getattr(microphone, 'SAMPLE_WIDTH', 2)
+        self.chunk = getattr(microphone, 'CHUNK', 1024)
+        self._frames = deque()
+        self._pending = b''
+        # Newest captured frame, for checks that must not consume audio
+        self._last_frame = b''
+        self._cond = threading.Condition()
+        self._users = 0
+        self._running = False
+        self._thread = None
+        self.frames_captured = 0
+        self.frames_dropped = 0
+
+    @property
+    def running(self):
+        return self._running
+
+    def start(self):
+        """Open the device (first caller only) and start the reader thread"""
+        with self._cond:
+            self._users += 1
+            if self._running:
+                return True
+            # The reader died (device error); reopen from scratch
+            self._close_device()
+            try:
+                self.microphone.__enter__()
+                if self.microphone.stream is None:
+                    raise OSError("microphone stream could not be opened")
+            except Exception as e:
+                self._users -= 1
+                logger.error(f"Error opening microphone: {e}")
+                return False
+            self.sample_rate = self.microphone.SAMPLE_RATE
+            self.sample_width = self.microphone.SAMPLE_WIDTH
+            self.chunk = self.microphone.CHUNK
+            max_frames = max(1, int(self.max_buffer_seconds * self.sample_rate / self.chunk))
+            self._frames = deque(maxlen=max_frames)
+            self._pending = b''
+            self._running = True
+            self._thread = threading.Thread(target=self._reader, daemon=True)
+            self._thread.start()
+            logger.info("🎙️ Microphone stream opened")
+            return True
+
+    def stop(self):
+        """Release one user; the last one closes the device"""
+        with self._cond:
+            self._users = max(0, self._users - 1)
+            if self._users:
+                return
+            self._running = False
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=2)
+        with self._cond:
+            # A start() may have raced in while the reader was winding down
+            if not self._users:
+                self._close_device()
+
+    def _close_device(self):
+        if getattr(self.microphone, 'stream', None) is None:
+            return
+        try:
+            self.microphone.__exit__(None, None, None)
+            logger.info("🎙️ Microphone stream closed")
+        except Exception as e:
+            logger.error(f"Error closing microphone: {e}")
+
+    def _reader(self):
+        stream = self.microphone.stream
+        while self._running and self._thread is threading.current_thread():
+            try:
+                frame = stream.read(self.chunk)
+            except Exception as e:
+                logger.error(f"Microphone read failed: {e}")
+                break
+            if not frame:
+                # File and synthetic sources end; a live microphone never does
+                logger.info("🎙️ Audio source ended")
+                break
+            with self._cond:
+                if len(self._frames) == self._frames.maxlen:
+                    self.frames_dropped += 1
+                self._frames.append(frame)
+                self._last_frame = frame
+                self.frames_captured += 1
+                self._cond.notify_all()
+        with self._cond:
+            # Only the current reader may mark capture as stopped
+            if self._thread is threading.current_thread():
+                self._running = False
+            self._cond.notify_all()
+
+    def read(self, size):
+        """Block until ``size`` frames (``size * sample_width`` bytes) are
+        buffered; returns what is left, then b'', after stop"""
+        size *= self.sample_width
+        with self._cond:
+            data = self._pending
+            while len(data) < size:
+                if self._frames:
+                    data += self._frames.popleft()
+                elif self._running:
+                    self._cond.wait(0.1)
+                else:
+                    self._pending = b''
+                    return data
+            self._pending = data[size:]
+            return data[:size]
+
+    def probe(self, timeout=2.0):
+        """One frame for a device check, as ``(frame, shared)``; call between
+        ``start()`` and ``stop()``. When another user has the capture open,
+        the next captured frame is returned without taking it from the
+        buffer (``shared`` is True); otherwise one frame is read."""
+        with self._cond:
+            if self._users > 1:
+                seen = self.frames_captured
+                self._cond.wait_for(lambda: self.frames_captured > seen or not self._running, timeout)
+                return self._last_frame, True
+        return self.read(self.chunk), False
+
+    def source(self):
+        """AudioSource view of the buffer for the recognizer and segmenter"""
+        return BufferedSource(self)
+
+    def get_stats(self):
+        with self._cond:
+            return {
+                'running': self._running,
+                'buffered_frames': len(self._frames),
+                'frames_captured': self.frames_captured,
+                'frames_dropped': self.frames_dropped
+            }
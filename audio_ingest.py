@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Browser Audio Ingestion
+Accepts 16 kHz mono PCM captured by the browser (cloud mode has no server
+microphone) and runs it through the same VAD segmentation and recognition
+pipeline as a local microphone, one buffer per browser session
+"""
+import itertools
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+try:
+    import fcntl
+except Exception:
+    # No cross-process locking (Windows); sessions are then per process
+    fcntl = None
+from speech_streaming import StreamingSegmenter
+from noise_calibration import NoiseCalibration
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+# Largest single upload accepted (about 8 s of audio)
+MAX_CHUNK_BYTES = 256 * 1024
+# Audio a session's spool may hold (about 4 min) before uploads are refused
+MAX_SPOOL_BYTES = int(os.getenv('TELEPROMPTER_AUDIO_SPOOL_MAX', str(8 * 1024 * 1024)))
+# Consumed audio after which the reader truncates the spool back to empty
+COMPACT_SPOOL_BYTES = 1024 * 1024
+SESSION_ID = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+class SpoolSource:
+    """AudioSource-like reader that tails a session's PCM spool file.
+
+    ``read`` blocks until audio arrives and returns b'' once nothing new
+    has been written for ``idle_timeout`` seconds, which ends the session.
+    Once it has consumed everything written and more than
+    COMPACT_SPOOL_BYTES in all, it truncates the file under the writers'
+    lock, so a long session's spool stays small."""
+
+    SAMPLE_RATE = SAMPLE_RATE
+    SAMPLE_WIDTH = SAMPLE_WIDTH
+    CHUNK = 1024
+
+    def __init__(self, path, idle_timeout):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.stream = self
+        self._file = open(path, 'r+b')
+        self._pending = b''
+
+    def read(self, size):
+        wanted = size * self.SAMPLE_WIDTH
+        idle_since = time.monotonic()
+        while len(self._pending) < wanted:
+            data = self._file.read(wanted - len(self._pending))
+            if data:
+                self._pending += data
+                idle_since = time.monotonic()
+            elif self._compact():
+                continue
+            elif time.monotonic() - idle_since > self.idle_timeout:
+                return b''
+            else:
+                time.sleep(0.02)
+        frame, self._pending = self._pending[:wanted], self._pending[wanted:]
+        return frame
+
+    def _compact(self):
+        """Truncate a fully consumed spool; True if it was truncated"""
+        if fcntl is None or self._file.tell() < COMPACT_SPOOL_BYTES:
+            return False
+        fcntl.flock(self._file, fcntl.LOCK_EX)
+        try:
+            # Writers append under the same lock, so nothing can land between the check and the truncate
+            if os.fstat(self._file.fileno()).st_size != self._file.tell():
+                return False
+            self._file.truncate(0)
+            self._file.seek(0)
+            return True
+        finally:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def close(self):
+        self._file.close()
+
+
+class BrowserAudioIngest:
+    """Per-session audio spools shared by every worker process on the host.
+
+    Any worker may receive a session's uploads; each upload is appended to
+    ``<directory>/<session>.pcm``. The first process to take the session's
+    lock file runs the reader thread, so a session is segmented exactly
+    once even when gunicorn spreads its requests across workers. Finished
+    phrases go to ``on_phrase(audio)``; every session's detector starts
+    from, and keeps refreshing, the shared browser noise ``calibration``.
+    Their phrase ids come from ``phrase_ids``, shared with the microphone
+    loop so a phrase id names one phrase across every source."""
+
+    def __init__(self, on_phrase, directory=None, idle_timeout=10.0, calibration=None, phrase_ids=None):
+        self.on_phrase = on_phrase
+        self.phrase_ids = phrase_ids if phrase_ids is not None else itertools.count(1)
+        self.calibration = calibration or NoiseCalibration('browser')
+        self.directory = directory or os.getenv(
+            'TELEPROMPTER_AUDIO_DIR', os.path.join(tempfile.gettempdir(), 'qwizzy_audio')
+        )
+        self.idle_timeout = idle_timeout
+        self._readers = {}
+        self._lock = threading.Lock()
+        self.bytes_received = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+    def push(self, session_id, pcm):
+        """Append one upload of little-endian int16 mono PCM to a session"""
+        if not SESSION_ID.match(session_id or ''):
+            raise ValueError('invalid session id')
+        if len(pcm) > MAX_CHUNK_BYTES:
+            raise ValueError('chunk too large')
+        if len(pcm) % SAMPLE_WIDTH:
+            raise ValueError('PCM length must be a whole number of 16-bit samples')
+        path = os.path.join(self.directory, f"{session_id}.pcm")
+        # O_APPEND keeps concurrent writers from different workers from overlapping
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            if fcntl is not None:
+                # Held only for the write, so the reader never truncates under it
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size + len(pcm) > MAX_SPOOL_BYTES:
+                raise ValueError('session audio backlog full')
+            os.write(fd, pcm)
+        finally:
+            os.close(fd)
+        with self._lock:
+            self.bytes_received += len(pcm)
+        self._ensure_reader(session_id, path)
+        return {'session': session_id, 'received': len(pcm)}
+
+    def _ensure_reader(self, session_id, path):
+        with self._lock:
+            if session_id in self._readers:
+                return
+            lock_file = open(path + '.lock', 'w')
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Another worker owns this session
+                lock_file.close()
+                return
+            thread = threading.Thread(target=self._read_session, args=(session_id, path, lock_file), daemon=True)
+            self._readers[session_id] = thread
+            thread.start()
+
+    def _read_session(self, session_id, path, lock_file):
+        logger.info(f"🌐 Browser audio session {session_id} started")
+        source = SpoolSource(path, self.idle_timeout)
+        try:
+            segmenter = StreamingSegmenter(source, self.calibration.detector(SAMPLE_RATE), phrase_ids=self.phrase_ids)
+            segmenter.run(lambda: True, None, lambda phrase_id, audio: self.on_phrase(audio))
+        except Exception as e:
+            logger.error(f"Browser audio session {session_id} failed: {e}")
+        finally:
+            source.close()
+            self.calibration.save()
+            with self._lock:
+                self._readers.pop(session_id, None)
+                # Remove the spool while still holding the lock so no other worker adopts it
+                for stale in (path, path + '.lock'):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                lock_file.close()
+            logger.info(f"🌐 Browser audio session {session_id} ended")
+
+    def get_stats(self):
+        with self._lock:
+            return {'active_sessions': len(self._readers), 'bytes_received': self.bytes_received}
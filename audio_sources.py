@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Audio Sources
+Stand-ins for sr.Microphone (WAV files, directories of utterances and a
+synthetic speech generator) plus a scripted recognizer, so the capture ->
+recognition -> response path runs headless and deterministically
+"""
+import glob
+import logging
+import os
+import threading
+import time
+import wave
+try:
+    import numpy as np
+except Exception:
+    np = None
+try:
+    import speech_recognition as sr
+except Exception:
+    sr = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SCRIPT = [
+    "Can you tell me about your research experience?",
+    "How would you approach a new machine learning project?",
+    "Why are you interested in this position at Newcastle University?",
+    "What was the most difficult technical challenge you have faced?",
+    "How do you mentor junior researchers in your team?",
+    "How would you extend SecureFed to handle malicious clients?",
+]
+
+
+class _PCMStream:
+    """Paced reader over a generator of int16 sample blocks"""
+
+    def __init__(self, blocks, sample_rate, speed):
+        self._blocks = blocks
+        self._buffer = np.zeros(0, dtype=np.int16)
+        self._sample_rate = sample_rate
+        self._speed = speed
+        self._started = time.monotonic()
+        self._emitted = 0
+
+    def read(self, size):
+        """``size`` frames of 16-bit mono PCM; b'' once the source is exhausted"""
+        while self._buffer.size < size:
+            block = next(self._blocks, None)
+            if block is None:
+                break
+            self._buffer = np.concatenate((self._buffer, block))
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        if data.size == 0:
+            return b''
+        self._emitted += data.size
+        if self._speed > 0:
+            # Hand out audio no faster than it would arrive from a device
+            due = self._started + self._emitted / (self._sample_rate * self._speed)
+            delay = due - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        return data.tobytes()
+
+    def close(self):
+        pass
+
+
+class _PCMSource:
+    """Microphone-compatible context manager; subclasses yield sample blocks"""
+
+    SAMPLE_WIDTH = 2
+
+    def __init__(self, sample_rate=16000, chunk_size=1024, speed=1.0):
+        self.SAMPLE_RATE = sample_rate
+        self.CHUNK = chunk_size
+        self.speed = speed
+        self.stream = None
+
+    def _blocks(self):
+        raise NotImplementedError
+
+    def _silence(self, seconds):
+        return np.zeros(int(seconds * self.SAMPLE_RATE), dtype=np.int16)
+
+    def __enter__(self):
+        self.stream = _PCMStream(self._blocks(), self.SAMPLE_RATE, self.speed)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+
+class WavFileSource(_PCMSource):
+    """Plays a WAV file, or every *.wav in a directory in name order.
+
+    Utterances are separated by ``gap`` seconds of silence and played at
+    ``speed`` times real time (0 = as fast as the reader consumes). Audio
+    is mixed down to mono 16-bit and resampled to ``sample_rate``."""
+
+    def __init__(self, path, sample_rate=16000, chunk_size=1024, speed=1.0, gap=1.0, loop=False):
+        super().__init__(sample_rate, chunk_size, speed)
+        if os.path.isdir(path):
+            self.paths = sorted(glob.glob(os.path.join(path, '*.wav')))
+        else:
+            self.paths = [path]
+        if not self.paths:
+            raise FileNotFoundError(f"No WAV files found at {path}")
+        self.gap = gap
+        self.loop = loop
+        self._cache = {}
+
+    def _load(self, path):
+        samples = self._cache.get(path)
+        if samples is not None:
+            return samples
+        with wave.open(path, 'rb') as wav:
+            width = wav.getsampwidth()
+            channels = wav.getnchannels()
+            rate = wav.getframerate()
+            raw = wav.readframes(wav.getnframes())
+        if width != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if rate != self.SAMPLE_RATE and samples.size:
+            positions = np.arange(0, samples.size, rate / self.SAMPLE_RATE)
+            samples = np.interp(positions, np.arange(samples.size), samples)
+        samples = samples.astype(np.int16)
+        self._cache[path] = samples
+        return samples
+
+    def _blocks(self):
+        while True:
+            for path in self.paths:
+                yield self._load(path)
+                yield self._silence(self.gap)
+            if not self.loop:
+                return
+
+
+class SyntheticSpeechSource(_PCMSource):
+    """Generates speech-like audio: voiced harmonic 'words' separated by
+    short pauses, utterances separated by silence, over low background
+    noise. Seeded, so every run produces the same audio."""
+
+    def __init__(self, utterances=None, sample_rate=16000, chunk_size=1024, speed=1.0,
+                 gap=1.5, noise_level=30.0, seed=0):
+        super().__init__(sample_rate, chunk_size, speed)
+        self.utterances = utterances
+        self.gap = gap
+        self.noise_level = noise_level
+        self.seed = seed
+
+    def _word(self, rng, seconds):
+        t = np.arange(int(seconds * self.SAMPLE_RATE)) / self.SAMPLE_RATE
+        f0 = rng.uniform(100, 220)
+        # 20 ms attack and release so words do not click
+        envelope = np.minimum(1.0, np.minimum(t, seconds - t) / 0.02)
+        voiced = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in (1, 2, 3))
+        return envelope * rng.uniform(2000, 5000) * voiced
+
+    def _blocks(self):
+        rng = np.random.default_rng(self.seed)
+        count = 0
+        while self.utterances is None or count < self.utterances:
+            parts = [np.zeros(0)]
+            for _ in range(int(rng.integers(5, 13))):
+                parts.append(self._word(rng, rng.uniform(0.2, 0.4)))
+                parts.append(np.zeros(int(rng.uniform(0.08, 0.2) * self.SAMPLE_RATE)))
+            parts.append(np.zeros(int(self.gap * self.SAMPLE_RATE)))
+            audio = np.concatenate(parts)
+            audio += rng.normal(0, self.noise_level, audio.size)
+            yield np.clip(audio, -32768, 32767).astype(np.int16)
+            count += 1
+
+
+class ScriptedSpeechBackend:
+    """Recognizer stand-in returning scripted transcripts, one per phrase.
+
+    Phrases tagged with a ``phrase_id`` by the segmenter map to line
+    ``phrase_id``; partial snapshots of a phrase get the same line.
+    ``latency`` seconds are slept per call to mimic a network recognizer."""
+
+    name = 'scripted'
+
+    def __init__(self, script=None, latency=0.0):
+        self.script = list(script or DEFAULT_SCRIPT)
+        self.latency = latency
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path, latency=0.0):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls([line.strip() for line in f if line.strip()], latency)
+
+    def warm(self):
+        return True
+
+    def transcribe(self, audio):
+        phrase_id = getattr(audio, 'phrase_id', None)
+        if phrase_id is None:
+            with self._lock:
+                self._counter += 1
+                phrase_id = self._counter
+        if self.latency:
+            time.sleep(self.latency)
+        return self.script[(phrase_id - 1) % len(self.script)]
+
+
+def create_audio_source():
+    """Input named by AUDIO_SOURCE: 'microphone' (default), 'synthetic',
+    or a path to a WAV file or directory of WAV files.
+
+    AUDIO_SOURCE_SPEED sets the playback rate for non-microphone sources
+    (1.0 = real time, 0 = unpaced)."""
+    name = os.getenv('AUDIO_SOURCE', 'microphone')
+    speed = float(os.getenv('AUDIO_SOURCE_SPEED', '1.0'))
+    if name == 'microphone':
+        return sr.Microphone()
+    if name == 'synthetic':
+        logger.info("🎛️ Using synthetic speech audio source")
+        return SyntheticSpeechSource(speed=speed)
+    logger.info(f"🎛️ Using WAV audio source {name}")
+    return WavFileSource(name, speed=speed, loop=os.getenv('AUDIO_SOURCE_LOOP', '0') == '1')
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+End-to-End Latency Benchmark
+Drives every platform variant with scripted utterances through a fake
+recognizer and measures how long each response takes to show up on its
+HTTP API, alone and under concurrent pollers
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+# Scripted recognizer and synthetic input, set before any engine is imported
+os.environ['SPEECH_BACKEND'] = 'scripted'
+os.environ['SPEECH_SCRIPT_LATENCY'] = os.getenv('BENCHMARK_ASR_LATENCY', '0')
+os.environ['AUDIO_SOURCE'] = 'synthetic'
+os.environ.setdefault('TELEPROMPTER_JOURNAL_DIR', tempfile.mkdtemp(prefix='qwizzy_bench_'))
+
+import requests
+import speech_recognition as sr
+from werkzeug.serving import make_server
+from audio_sources import DEFAULT_SCRIPT
+from latency_metrics import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+
+def _main_platform():
+    from integrated_main_platform import IntegratedMainPlatform
+    engine = IntegratedMainPlatform()
+    return engine, engine.app, '/api/teleprompter/response'
+
+
+def _integrated_teleprompter():
+    from integrated_teleprompter import IntegratedTeleprompter
+    engine = IntegratedTeleprompter()
+    return engine, engine.app, '/api/teleprompter/response'
+
+
+def _teleprompter_server():
+    import teleprompter_server
+    return teleprompter_server.get_teleprompter(), teleprompter_server.app, '/api/response'
+
+
+def _web_platform():
+    from web_interview_platform import WebInterviewPlatform
+    engine = WebInterviewPlatform()
+    return engine, engine.app, '/api/current_response'
+
+
+def _desktop_platform():
+    # Built without its Tk window, so it runs without a display; the web part is what clients see
+    from desktop_interview_platform import DesktopInterviewPlatform
+    engine = DesktopInterviewPlatform(headless=True)
+    return engine, engine.web_app, '/api/current_response'
+
+
+ENGINES = {
+    'integrated_main_platform': _main_platform,
+    'integrated_teleprompter': _integrated_teleprompter,
+    'teleprompter_server': _teleprompter_server,
+    'web_interview_platform': _web_platform,
+    'desktop_interview_platform': _desktop_platform,
+}
+
+
+class ServedEngine:
+    """One engine behind a real threaded HTTP server on a free local port"""
+
+    def __init__(self, name, factory):
+        self.name = name
+        self.engine, app, self.path = factory()
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.url = f"http://127.0.0.1:{self.server.server_port}{self.path}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.phrase_id = 0
+
+    def inject(self):
+        """Queue one utterance through the engine's recognition pipeline; returns its transcript"""
+        self.phrase_id += 1
+        # The scripted recognizer maps phrase_id to a script line; the audio itself is silence
+        audio = sr.AudioData(b'\0' * 3200, 16000, 2)
+        audio.phrase_id = self.phrase_id
+        self.engine.speech_pipeline.submit(audio)
+        return DEFAULT_SCRIPT[(self.phrase_id - 1) % len(DEFAULT_SCRIPT)]
+
+    def close(self):
+        self.server.shutdown()
+
+
+def _poller(url, stop, counts, errors):
+    session = requests.Session()
+    while not stop.is_set():
+        try:
+            session.get(url, timeout=5).raise_for_status()
+            counts.append(1)
+        except requests.RequestException:
+            errors.append(1)
+
+
+def measure(served, utterances, pollers, poll_interval, timeout=10.0):
+    """Latency of ``utterances`` injections with ``pollers`` clients hammering the API"""
+    stop = threading.Event()
+    counts, errors = [], []
+    threads = [
+        threading.Thread(target=_poller, args=(served.url, stop, counts, errors), daemon=True)
+        for _ in range(pollers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    latency = RollingWindow(utterances)
+    missed = 0
+    observer = requests.Session()
+    started = time.monotonic()
+    for _ in range(utterances):
+        injected_at = time.monotonic()
+        question = served.inject()
+        deadline = injected_at + timeout
+        while time.monotonic() < deadline:
+            try:
+                if observer.get(served.url, timeout=5).json().get('question') == question:
+                    latency.add((time.monotonic() - injected_at) * 1000.0)
+                    break
+            except (requests.RequestException, ValueError):
+                pass
+            time.sleep(poll_interval)
+        else:
+            missed += 1
+    elapsed = time.monotonic() - started
+
+    stop.set()
+    for thread in threads:
+        thread.join(timeout=10)
+    result = {
+        'pollers': pollers,
+        'utterances': utterances,
+        'missed': missed,
+        'poll_requests_per_second': round(len(counts) / elapsed, 1),
+        'poll_errors': len(errors),
+    }
+    result['latency_ms'] = latency.summary() if latency.samples else None
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(report, baseline, tolerance):
+    """Print p50/p95 changes against a previous report; returns the regressions"""
+    previous = {
+        (row['engine'], row['pollers']): row for row in baseline.get('results', []) if row.get('latency_ms')
+    }
+    regressions = []
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')}):")
+    for row in report['results']:
+        before = previous.get((row['engine'], row['pollers']))
+        if not before or not row.get('latency_ms'):
+            continue
+        line = [f"  {row['engine']:<28} pollers={row['pollers']:<3}"]
+        for key in ('p50', 'p95'):
+            old, new = before['latency_ms'][key], row['latency_ms'][key]
+            change = (new - old) / old if old else 0.0
+            line.append(f"{key} {old:.1f} -> {new:.1f} ms ({change:+.0%})")
+            if key == 'p95' and change > tolerance:
+                regressions.append(row)
+                line.append("⚠️ REGRESSION")
+        print("  ".join(line))
+    return regressions
+
+
+def print_table(report):
+    print(f"\n{'engine':<28} {'pollers':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'polls/s':>9} {'missed':>6}")
+    for row in report['results']:
+        if row.get('status') == 'skipped':
+            print(f"{row['engine']:<28} skipped: {row['reason']}")
+            continue
+        lat = row['latency_ms'] or {}
+        print(
+            f"{row['engine']:<28} {row['pollers']:>7} {lat.get('p50', 0):>8.2f} {lat.get('p95', 0):>8.2f} "
+            f"{lat.get('p99', 0):>8.2f} {lat.get('max', 0):>8.2f} {row['poll_requests_per_second']:>9.1f} {row['missed']:>6}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--engines', default=','.join(ENGINES), help='comma-separated engines to run')
+    parser.add_argument('--utterances', type=int, default=20, help='utterances per run')
+    parser.add_argument('--pollers', default='0,16', help='comma-separated concurrent poller counts')
+    parser.add_argument('--poll-interval', type=float, default=0.002, help='observer poll interval (s)')
+    parser.add_argument('--output', default='benchmark_report.json', help='where to write the JSON report')
+    parser.add_argument('--baseline', help='previous report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 growth before flagging')
+    args = parser.parse_args()
+
+    # Engine and request logs would dominate the timings
+    logging.disable(logging.INFO)
+    poller_counts = [int(n) for n in args.pollers.split(',') if n.strip()]
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'asr_latency_s': float(os.environ['SPEECH_SCRIPT_LATENCY']),
+        'results': []
+    }
+
+    for name in [n.strip() for n in args.engines.split(',') if n.strip()]:
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name}; choose from {', '.join(ENGINES)}")
+        print(f"⏱️  {name}...")
+        try:
+            served = ServedEngine(name, ENGINES[name])
+        except Exception as e:
+            report['results'].append({'engine': name, 'status': 'skipped', 'reason': f"{type(e).__name__}: {e}"})
+            continue
+        try:
+            # One throwaway utterance so first-request setup is not timed
+            measure(served, 1, 0, args.poll_interval)
+            for pollers in poller_counts:
+                row = measure(served, args.utterances, pollers, args.poll_interval)
+                row.update({'engine': name, 'status': 'ok'})
+                report['results'].append(row)
+        finally:
+            served.close()
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print_table(report)
+    print(f"\n📄 Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
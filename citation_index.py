@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Citation Index
+Scored retrieval over curated references, built once at startup, so the
+papers a question should cite are found with one sparse lookup instead of
+per-paper keyword lists
+"""
+import logging
+import math
+import os
+import re
+from collections import Counter
+try:
+    from sklearn.feature_extraction.text import TfidfVectorizer  # type: ignore
+except Exception:
+    TfidfVectorizer = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Record fields searched, with how many times each counts; titles and keywords weigh most
+TEXT_FIELDS = (
+    ('title', 2), ('keywords', 2), ('summary', 1), ('highlights', 1),
+    ('positioning', 1), ('talk_tracks', 1)
+)
+
+# Fields a question must hit for a record to be cited at all; the rest only add to its score
+ANCHOR_FIELDS = ('title', 'keywords')
+
+# Question words, and words in so many paper titles they say nothing about the topic
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be because been being both but by can could
+did do does doing done for from had has have having he her here hers him his how i if in into is it its
+just me more most my no not of on or our out over own please s same she should so some such t tell than
+that the their them then there these they this those through to too under up us very was we were what
+when where which while who whom why will with would you your yours
+approach based effective framework method novel system systems towards using
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+# Longest first; 'localise', 'localisation' and 'localization' all become 'local'
+SUFFIXES = (
+    'isations', 'izations', 'isation', 'ization', 'ations', 'ation', 'ising', 'izing',
+    'ised', 'ized', 'ises', 'izes', 'ise', 'ize', 'ings', 'ing', 's'
+)
+
+
+def stem(token):
+    """Strip one common suffix from a plain word, keeping at least four letters"""
+    if len(token) <= 4 or not token.isalpha():
+        return token
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+            if suffix == 's' and token.endswith('ss'):
+                return token
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    """Stemmed lowercase content words; '802.11mc' and 'real-time' stay whole and also split"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token not in STOP_WORDS:
+            tokens.append(stem(token))
+        if '.' in token or '-' in token:
+            tokens.extend(stem(part) for part in re.split(r'[.\-]', token) if part and part not in STOP_WORDS)
+    return tokens
+
+
+def _field_text(value):
+    if isinstance(value, dict):
+        return ' '.join(str(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(v) for v in value)
+    return str(value)
+
+
+def record_text(record):
+    """Searchable text of one reference record, weighted per TEXT_FIELDS"""
+    parts = []
+    for field, weight in TEXT_FIELDS:
+        value = record.get(field)
+        if value:
+            parts.extend([_field_text(value)] * weight)
+    return ' '.join(parts)
+
+
+def record_anchors(record):
+    """Terms of a record's ANCHOR_FIELDS"""
+    return frozenset(tokenize(' '.join(_field_text(record[f]) for f in ANCHOR_FIELDS if record.get(f))))
+
+
+class PostingsScorer:
+    """Sum of query-term weight times document-term weight over an inverted
+    index, so a query only touches the postings of its own terms"""
+
+    def __init__(self):
+        # term -> [(document, weight)]
+        self.postings = {}
+
+    def query_weights(self, tokens):
+        return dict.fromkeys(tokens, 1.0)
+
+    def scores(self, query):
+        totals = {}
+        for term, query_weight in self.query_weights(tokenize(query)).items():
+            for doc, weight in self.postings.get(term, ()):
+                totals[doc] = totals.get(doc, 0.0) + query_weight * weight
+        return totals
+
+
+class TfidfScorer(PostingsScorer):
+    """Cosine similarity of scikit-learn TF-IDF vectors. The vectorizer is
+    only used to fit; queries are weighted by hand from its idf table,
+    since ``transform`` alone costs about a millisecond."""
+
+    name = 'tfidf'
+
+    def __init__(self, documents):
+        super().__init__()
+        vectorizer = TfidfVectorizer(tokenizer=tokenize, lowercase=False, token_pattern=None, sublinear_tf=True)
+        # Rows come back L2-normalized; columns are the postings
+        matrix = vectorizer.fit_transform(documents).tocsc()
+        self.idf = {}
+        for term, column in vectorizer.vocabulary_.items():
+            start, end = matrix.indptr[column], matrix.indptr[column + 1]
+            self.postings[term] = list(zip(matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()))
+            self.idf[term] = float(vectorizer.idf_[column])
+
+    def query_weights(self, tokens):
+        # Same sublinear tf * idf, L2-normalized, as the documents
+        weights = {
+            term: (1.0 + math.log(tf)) * self.idf[term] for term, tf in Counter(tokens).items() if term in self.idf
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {term: w / norm for term, w in weights.items()}
+
+
+class BM25Scorer(PostingsScorer):
+    """Okapi BM25 with per-posting weights precomputed"""
+
+    name = 'bm25'
+
+    def __init__(self, documents, k1=1.2, b=0.75):
+        super().__init__()
+        counts = [Counter(tokenize(document)) for document in documents]
+        average = sum(sum(c.values()) for c in counts) / max(1, len(counts))
+        frequency = Counter(term for c in counts for term in c)
+        n = len(counts)
+        for doc, c in enumerate(counts):
+            norm = k1 * (1 - b + b * sum(c.values()) / (average or 1))
+            for term, tf in c.items():
+                idf = math.log(1 + (n - frequency[term] + 0.5) / (frequency[term] + 0.5))
+                self.postings.setdefault(term, []).append((doc, idf * tf * (k1 + 1) / (tf + norm)))
+
+
+class CitationIndex:
+    """Top-k references for a question.
+
+    A record is only cited when the question shares a term with its title
+    or keywords, the data-driven equivalent of per-paper keyword lists;
+    the remaining fields only add to its score. Of those, records scoring
+    at least CITATION_RELATIVE_CUTOFF (default 0.3) of the best one, and
+    at least CITATION_MIN_SCORE (default 0), are returned, best first and
+    at most CITATION_TOP_K (default 3). Scores come from TF-IDF when
+    scikit-learn is installed and BM25 otherwise (CITATION_SCORER=tfidf|bm25
+    to choose). ``get`` returns a record by id, through ``lookup`` when
+    given so only ids, anchors and postings are held here."""
+
+    def __init__(self, records, top_k=None, threshold=None, relative_cutoff=None, scorer=None, lookup=None):
+        self.ids, self.anchors, documents, by_id = [], [], [], {}
+        for record in records:
+            self.ids.append(record['id'])
+            self.anchors.append(record_anchors(record))
+            documents.append(record_text(record))
+            if lookup is None:
+                by_id[record['id']] = record
+        self._lookup = lookup or by_id.get
+        self.top_k = top_k or int(os.getenv('CITATION_TOP_K', '3'))
+        scorer = (scorer or os.getenv('CITATION_SCORER') or ('tfidf' if TfidfVectorizer is not None else 'bm25')).lower()
+        if scorer == 'tfidf' and TfidfVectorizer is None:
+            logger.warning("CITATION_SCORER=tfidf needs scikit-learn; using bm25")
+            scorer = 'bm25'
+        elif scorer not in ('tfidf', 'bm25'):
+            logger.warning(f"Unknown CITATION_SCORER '{scorer}'; using bm25")
+            scorer = 'bm25'
+        self.scorer = (TfidfScorer if scorer == 'tfidf' else BM25Scorer)(documents) if documents else None
+        self.threshold = threshold if threshold is not None else float(os.getenv('CITATION_MIN_SCORE', '0'))
+        self.relative_cutoff = (
+            relative_cutoff if relative_cutoff is not None else float(os.getenv('CITATION_RELATIVE_CUTOFF', '0.3'))
+        )
+        logger.info(f"📚 Citation index: {len(self.ids)} references ({scorer})")
+
+    def search(self, query, top_k=None):
+        """[(record id, score)] best first, at most ``top_k``"""
+        if self.scorer is None:
+            return []
+        terms = set(tokenize(query))
+        scored = [
+            (score, doc) for doc, score in self.scorer.scores(query).items()
+            if score >= self.threshold and not self.anchors[doc].isdisjoint(terms)
+        ]
+        if not scored:
+            return []
+        cutoff = max(score for score, _ in scored) * self.relative_cutoff
+        scored = [(score, doc) for score, doc in scored if score >= cutoff]
+        scored.sort(key=lambda item: (-item[0], item[1]))
+        return [(self.ids[doc], round(score, 4)) for score, doc in scored[:top_k or self.top_k]]
+
+    def get(self, record_id):
+        return self._lookup(record_id)
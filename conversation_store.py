@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Conversation Store for the teleprompter platforms
+Append-only history with monotonic sequence numbers, cursor reads and
+ETag support so pollers only download what changed. Memory is bounded by
+a ring buffer of compact records that spills older entries to disk.
+"""
+import atexit
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from array import array
+from collections import deque
+from datetime import datetime
+from flask import Response, jsonify, request
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Page size for cursor reads when the client does not ask for one
+DEFAULT_PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# Sentinel: use CONVERSATION_SPILL_DIR (default: the system temp dir)
+_DEFAULT_SPILL_DIR = object()
+
+
+class ConversationEntry:
+    """One utterance. Timestamps are kept as int nanoseconds and rendered
+    to ISO strings only when serialized."""
+
+    __slots__ = ('seq', 'speaker', 'text', 'time_ns')
+
+    def __init__(self, seq, speaker, text, time_ns):
+        self.seq = seq
+        # Only a couple of speaker names exist; share one string object
+        self.speaker = sys.intern(speaker)
+        self.text = text
+        self.time_ns = time_ns
+
+    @property
+    def timestamp(self):
+        return datetime.fromtimestamp(self.time_ns / 1e9).isoformat()
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'speaker': self.speaker,
+            'text': self.text,
+            'timestamp': self.timestamp
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['seq'], data['speaker'], data['text'], _iso_to_ns(data['timestamp']))
+
+
+class ConversationStore:
+    """Conversation history whose entries carry a monotonic ``seq``.
+
+    Only the newest ``max_entries`` stay in memory (a ring buffer). Older
+    entries spill to an append-only JSONL file in ``spill_dir``; cursor
+    reads reach back into it through an array of byte offsets, so memory
+    stays flat however long the session runs. The file is named by the
+    current ``epoch`` and deleted by ``close()``, ``clear()`` or at exit.
+    With ``spill_dir=None`` evicted entries are dropped."""
+
+    def __init__(self, max_entries=None, spill_dir=_DEFAULT_SPILL_DIR):
+        if max_entries is None:
+            max_entries = int(os.getenv('CONVERSATION_MAX_ENTRIES', '500'))
+        if spill_dir is _DEFAULT_SPILL_DIR:
+            spill_dir = os.getenv('CONVERSATION_SPILL_DIR', tempfile.gettempdir()) or None
+        self.max_entries = max(1, max_entries)
+        self._entries = deque()
+        self._last_seq = 0
+        self._last_time_ns = 0
+        self._lock = threading.Lock()
+        # Distinguishes this store from one with the same seqs before a restart
+        self.epoch = uuid.uuid4().hex[:8]
+        self.spill_dir = spill_dir
+        # Byte offset of each spilled entry; spilled seqs are contiguous from _spill_first_seq
+        self._spill_offsets = array('q')
+        self._spill_first_seq = 1
+        self._spill_file = None
+        # Optional callable receiving each new entry dict (e.g. a journal)
+        self.on_append = None
+
+    @property
+    def spill_path(self):
+        """Spill file for the current epoch, which ``restore`` may have replaced"""
+        if not self.spill_dir:
+            return None
+        return os.path.join(self.spill_dir, f"qwizzy_conversation_{self.epoch}.jsonl")
+
+    def restore(self, entries, last_seq, epoch=None):
+        """Reload recovered entries (oldest first) into an empty store"""
+        with self._lock:
+            for data in entries[-self.max_entries:]:
+                self._entries.append(ConversationEntry.from_dict(data))
+            self._last_seq = last_seq
+            self._spill_first_seq = last_seq + 1
+            if self._entries:
+                self._last_time_ns = self._entries[-1].time_ns
+                self._spill_first_seq = self._entries[0].seq
+            if epoch:
+                self.epoch = epoch
+
+    def append(self, speaker, text, timestamp=None):
+        """Append an entry and return it as a dict"""
+        with self._lock:
+            time_ns = _iso_to_ns(timestamp) if timestamp else time.time_ns()
+            # Keep timestamps strictly increasing even if the wall clock steps back
+            time_ns = max(time_ns, self._last_time_ns + 1)
+            self._last_time_ns = time_ns
+            self._last_seq += 1
+            entry = ConversationEntry(self._last_seq, speaker, text, time_ns)
+            self._entries.append(entry)
+            while len(self._entries) > self.max_entries:
+                self._evict(self._entries.popleft())
+            data = entry.to_dict()
+            if self.on_append is not None:
+                self.on_append(data)
+            return data
+
+    def _evict(self, entry):
+        if self.spill_dir is None:
+            self._spill_first_seq = entry.seq + 1
+            return
+        try:
+            if self._spill_file is None:
+                # Truncates whatever a crashed process with the same epoch left behind
+                self._spill_file = open(self.spill_path, 'wb+')
+                atexit.register(self.close)
+            self._spill_file.seek(0, os.SEEK_END)
+            self._spill_offsets.append(self._spill_file.tell())
+            self._spill_file.write(json.dumps(entry.to_dict()).encode('utf-8') + b'\n')
+            self._spill_file.flush()
+        except OSError as e:
+            logger.error(f"Conversation spill failed, dropping entry {entry.seq}: {e}")
+            self._spill_offsets = array('q')
+            self._spill_first_seq = entry.seq + 1
+
+    def _read_spilled(self, seq, limit):
+        """Spilled entries with seq greater than ``seq`` (caller holds the lock)"""
+        index = max(seq + 1 - self._spill_first_seq, 0)
+        if self._spill_file is None or index >= len(self._spill_offsets):
+            return []
+        self._spill_file.seek(self._spill_offsets[index])
+        count = len(self._spill_offsets) - index
+        if limit is not None:
+            count = min(count, limit)
+        return [json.loads(self._spill_file.readline()) for _ in range(count)]
+
+    def _remove_spill(self):
+        """Close and delete the spill file (caller holds the lock)"""
+        if self._spill_file is None:
+            return
+        path = self._spill_file.name
+        try:
+            self._spill_file.close()
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Could not remove conversation spill file {path}: {e}")
+        self._spill_file = None
+        self._spill_offsets = array('q')
+        atexit.unregister(self.close)
+
+    def clear(self):
+        """Drop every entry and the spill file; seqs keep counting up"""
+        with self._lock:
+            self._entries.clear()
+            self._remove_spill()
+            self._spill_first_seq = self._last_seq + 1
+
+    def close(self):
+        """Delete the spill file; entries evicted afterwards start a new one"""
+        with self._lock:
+            if self._spill_file is not None:
+                self._spill_first_seq = self._entries[0].seq if self._entries else self._last_seq + 1
+            self._remove_spill()
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    @property
+    def etag(self):
+        return f"{self.epoch}-{self._last_seq}"
+
+    def since(self, seq, limit=None):
+        """Entries with ``seq`` greater than the given cursor, oldest first"""
+        with self._lock:
+            entries = []
+            if self._entries and seq + 1 < self._entries[0].seq:
+                entries = self._read_spilled(seq, limit)
+                if limit is not None:
+                    limit -= len(entries)
+            first = self._entries[0].seq if self._entries else self._last_seq + 1
+            start = max(seq + 1 - first, 0)
+            stop = len(self._entries) if limit is None else min(len(self._entries), start + limit)
+            entries.extend(self._entries[i].to_dict() for i in range(start, stop))
+            return entries
+
+    def to_list(self):
+        """Entries still held in memory (the newest ``max_entries``)"""
+        with self._lock:
+            return [entry.to_dict() for entry in self._entries]
+
+    def __len__(self):
+        return len(self._entries) + len(self._spill_offsets)
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        return self._entries[index].to_dict()
+
+
+def _iso_to_ns(value):
+    return int(datetime.fromisoformat(value).timestamp() * 1_000_000) * 1000
+
+
+def conversation_response(store):
+    """Flask response for a conversation endpoint.
+
+    Without query parameters the entries still held in memory are returned.
+    ``?since=<seq>&limit=N`` returns only newer entries plus a cursor and
+    the store ``epoch``, which changes when a restart starts a new history.
+    Both forms answer ``If-None-Match`` with 304 while nothing changed."""
+    etag = store.etag
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    elif 'since' in request.args or 'limit' in request.args:
+        since = request.args.get('since', 0, type=int)
+        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        last_seq = store.last_seq
+        entries = store.since(since, limit + 1)
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        response = jsonify({
+            'entries': entries,
+            'next_since': entries[-1]['seq'] if entries else min(since, last_seq),
+            'last_seq': last_seq,
+            'has_more': has_more,
+            # Changes when the server restarts with a fresh history; clients then reset their cursor
+            'epoch': store.epoch
+        })
+    else:
+        response = jsonify(store.to_list())
+    response.set_etag(etag)
+    # Let browsers and proxies keep the body but revalidate on every poll
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -3,6 +3,7 @@
 Fully Integrated Interview Intelligence Platform
 Includes teleprompter functionality directly in the main platform
 """
+import itertools
 import json
 import requests
 from datetime import datetime
@@ -26,17 +27,38 @@ import qrcode
 from PIL import Image
 import base64
 import io
-from flask import Flask, render_template_string, jsonify, request, redirect, url_for
+from flask import Flask, render_template_string, jsonify, request, redirect, url_for, Response, stream_with_context
 try:
     from flask_cors import CORS  # type: ignore
 except Exception:
     CORS = None
+from teleprompter_events import EventBroker
+from teleprompter_ws import TeleprompterSocketServer
+from conversation_store import conversation_response
+from teleprompter_state import SnapshotCache, FastJSONProvider, create_state_store
+from audio_capture import AudioCapture
+from audio_sources import create_audio_source
+from speech_pipeline import SpeechPipeline
+from speech_backends import get_speech_backend
+from speech_streaming import StreamingSegmenter, PartialTranscriber
+from noise_calibration import NoiseCalibration
+from audio_ingest import BrowserAudioIngest
+from speculative import SpeculativeResponder
+from rule_packs import get_rule_pack
+from semantic_classifier import get_question_classifier
+from citation_index import CitationIndex
+from reference_store import ReferenceStore
+from reference_corpus import open_reference_corpus
+from latency_metrics import LatencyTracker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class IntegratedMainPlatform:
+    # Upper bound for long-poll waits; stays well under proxy and gunicorn timeouts
+    LONG_POLL_MAX_WAIT = 30.0
+    
     def __init__(self):
         # Interview context - Updated for Bo WEI from Newcastle University
         self.interview_context = {
@@ -64,32 +86,93 @@ class IntegratedMainPlatform:
             or os.getenv('RAILWAY_ENVIRONMENT') is not None
         )
 
-        # Audio processing
-        self.audio_queue = queue.Queue()
-        self.is_listening = False
-        self.recognizer = sr.Recognizer() if (sr is not None and not self.is_cloud) else None
-        # Only construct Microphone if SpeechRecognition and PyAudio are available
-        if sr is not None and not self.is_cloud and pyaudio is not None:
+        # Session state (listening flag, current response, conversation) lives in a
+        # pluggable store so every gunicorn worker sees the same session
+        self.state = create_state_store()
+        
+        # Serialized payloads for the polled endpoints, rebuilt once per state change
+        # and tagged with the store's epoch and version so ETags match across workers
+        self.snapshots = SnapshotCache(epoch=self.state.epoch)
+        
+        # Audio processing: captured phrases wait here for the recognition workers
+        self.audio_queue = queue.Queue(maxsize=int(os.getenv('SPEECH_QUEUE_SIZE', '8')))
+        # Cloud mode has no microphone but still recognizes audio streamed from the browser
+        self.recognizer = sr.Recognizer() if sr is not None else None
+        # Only construct Microphone if SpeechRecognition and PyAudio are available;
+        # file and synthetic sources (AUDIO_SOURCE) need neither PyAudio nor hardware
+        uses_device = os.getenv('AUDIO_SOURCE', 'microphone') == 'microphone'
+        if sr is not None and not self.is_cloud and (pyaudio is not None or not uses_device):
             try:
-                self.microphone = sr.Microphone()
+                self.microphone = create_audio_source()
             except Exception:
                 self.microphone = None
         else:
             self.microphone = None
+        # Long-lived input stream shared by the listening loop and the mic check
+        self.capture = AudioCapture(self.microphone) if self.microphone is not None else None
+        # Noise floor for this input, remembered between runs
+        self.calibration = NoiseCalibration.for_source(self.microphone)
+        # Google or a local model, per SPEECH_BACKEND
+        self.speech_backend = get_speech_backend(self.recognizer)
+        # Per-stage timings for every utterance, from capture end to first client fetch
+        self.latency = LatencyTracker()
+        self.speech_pipeline = SpeechPipeline(
+            lambda audio: self.speech_backend.transcribe(audio),
+            self.process_speech_input,
+            audio_queue=self.audio_queue,
+            ignore=(sr.UnknownValueError,) if sr is not None else (),
+            tracker=self.latency,
+            # Speculative candidates are kept per phrase
+            phrase_ids=True
+        )
+        # SPEECH_STREAMING=1 emits interim transcripts while the interviewer is still talking
+        self.streaming = os.getenv('SPEECH_STREAMING', '0') == '1'
+        # Phrase ids for every segmenter in the process, microphone and browser sessions alike, so one id
+        # names one phrase: partials are not taken as stale and speculation is keyed per phrase
+        self.phrase_ids = itertools.count(1)
+        self.partial_transcriber = PartialTranscriber(
+            lambda audio: self.speech_backend.transcribe(audio),
+            self.process_partial_transcript
+        )
+        # Question keywords and response text, reloaded when rule_packs/academic.json changes
+        self.rule_pack = get_rule_pack('academic')
+        # Keyword matching, or exemplar embeddings with QUESTION_CLASSIFIER=semantic
+        self.question_classifier = get_question_classifier(self.rule_pack)
+        # Candidate responses built from partials, committed when the final transcript matches
+        self.speculative = SpeculativeResponder(self.classify_question, self.build_response)
+        # Browser-captured audio (cloud mode) feeds the same recognition pipeline
+        self.audio_ingest = BrowserAudioIngest(self.speech_pipeline.submit, phrase_ids=self.phrase_ids)
         
         # Current conversation state
-        self.current_question = ""
-        self.last_response = ""
-        self.conversation_history = []
+        self.conversation_history = self.state.conversation
         self.question_context = []
         
+        # Long-poll requests wait on this until the response version changes
+        self.response_changed = threading.Condition()
+        
+        # Push channel for teleprompter clients (replaces per-tab polling)
+        self.events = EventBroker()
+        self.events.on_delivered = self.record_delivery
+        
+        # What this process has already published; see sync_from_state()
+        self._sync_lock = threading.Lock()
+        self._synced_version = self.snapshots.bump(self.state.version)
+        self._synced_seq = self.conversation_history.last_seq
+        self._synced_response_version = self.state.get('response_version')
+        self.state.watch(self.sync_from_state)
+        
         # Network info
         self.local_ip = self.get_local_ip()
         # Bind to dynamic port in cloud providers (Render/Railway), default 8000 locally
         self.web_port = int(os.getenv('PORT', '8000'))
+        # Bidirectional WebSocket transport runs on its own port when started via run()
+        self.ws_port = int(os.getenv('TELEPROMPTER_WS_PORT', str(self.web_port + 1)))
+        self.socket_server = TeleprompterSocketServer(self, port=self.ws_port)
+        self.ws_enabled = False
         
         # Web server setup
         self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
         # Enable permissive CORS in cloud to allow frontends on different origins
         if CORS is not None:
             try:
@@ -97,108 +180,45 @@ class IntegratedMainPlatform:
             except Exception:
                 pass
         self.setup_web_routes()
+        self.snapshots.register('status', self.get_status_payload)
+        self.snapshots.register('response', self.get_response_payload)
+        self.snapshots.register('conversation', self.conversation_history.to_list)
         
-        # Curated paper references for Dr. Bo Wei and related work
-        # These summaries are used to augment answers about his research areas
-        self.paper_references = [
-            {
-                'id': 'rWifiSLAM-2022',
-                'title': 'rWiFiSLAM: Effective WiFi Ranging based SLAM System in Ambient Environments',
-                'authors': ['Bo Wei', 'Mingcen Gao', 'Chengwen Luo', 'Sen Wang', 'Jin Zhang'],
-                'year': 2022,
-                'venue': 'arXiv:2212.08418',
-                'keywords': [
-                    'wifi', 'rtt', '802.11mc', 'slam', 'pose graph', 'indoor localisation',
-                    'imu', 'pdr', 'loop closure', 'clustering', 'robust optimization', 'access points'
-                ],
-                'summary': (
-                    'Proposes an indoor localisation system that fuses WiFi Round Trip Time (RTT) ranging '
-                    'with IMU-based Pedestrian Dead Reckoning (PDR) inside a robust pose-graph SLAM. '
-                    'Introduces a loop-closure mechanism using clustering over vectors of RTT observations, '
-                    'removing the need for known AP locations and tolerating multipath-induced ranging noise.'
-                ),
-                'highlights': [
-                    'No prior knowledge of WiFi AP locations required; works in dynamic environments',
-                    'RTT observation clustering used for loop closure; robust graph SLAM scales loop constraints',
-                    'Sub-meter accuracy achieved in real deployments; >90% improvement over IMU-only PDR',
-                    'Targets mobile devices using IEEE 802.11mc RTT; energy efficient vs camera/mmWave'
-                ]
-            },
-            {
-                'id': 'SecureFed-2024',
-                'title': 'SecureFed: A Two-Phase Framework for Detecting Malicious Clients in Federated Learning',
-                'authors': ['Likhitha A. Kavuri', 'Akshay Mhatre', 'Akarsh K Nair', 'Deepti Gupta'],
-                'year': 2024,
-                'venue': 'Preprint',
-                'keywords': [
-                    'federated learning', 'malicious clients', 'poisoning', 'backdoor', 'anomaly detection',
-                    'pca', 'dimensionality reduction', 'trust score', 'learning zones', 'robust aggregation'
-                ],
-                'summary': (
-                    'Introduces a two-phase defense for FL: Phase 1 detects anomalies via dimensionality reduction '
-                    'and synthetic validation; Phase 2 assigns clients to trust-based learning zones and performs '
-                    'zone-weighted aggregation using validation loss and gradient magnitude. Improves robustness '
-                    'to poisoning while preserving accuracy.'
-                ),
-                'highlights': [
-                    'Anomaly scoring with PCA and validation-threshold calibration',
-                    'Adaptive learning zones with trust-weighted aggregation',
-                    'Improved F1/accuracy under 30–48% malicious clients vs FedAvg',
-                    'Modular design compatible with standard FL pipelines'
-                ]
-            }
-        ]
+        # Curated paper references (Dr. Bo Wei and related work) and personal research,
+        # ingested from references/ into a corpus every worker maps read-only
+        self.reference_corpus = open_reference_corpus()
+        # Scored retrieval over both kinds picks what a response cites
+        self.citation_index = CitationIndex(self.reference_corpus, lookup=self.reference_corpus.get)
+        # Indexed once for the /api/references and /api/personal_work listings
+        self.reference_store = ReferenceStore(
+            self.reference_corpus.records('paper'), ('title', 'authors', 'keywords', 'summary'),
+            ('id', 'title', 'authors', 'year', 'venue'), lookup=self.reference_corpus.get
+        )
+        self.personal_work_store = ReferenceStore(
+            self.reference_corpus.records('personal'), ('title', 'author', 'keywords', 'positioning'),
+            ('id', 'title', 'author', 'date'), lookup=self.reference_corpus.get
+        )
         
-        # Personal research/proposal knowledge (Frank's QEP-VLA)
-        self.personal_work = [
-            {
-                'id': 'QEP-VLA-2025',
-                'title': 'Quantum-Enhanced Privacy-Preserving Vision-Language-Action (QEP-VLA) Framework',
-                'author': 'Frank van Laarhoven',
-                'date': '2025-09-17',
-                'role': 'Aspiring PhD Candidate',
-                'keywords': [
-                    'embodied ai', 'vision-language-action', 'privacy', 'quantum', 'qkd', 'zkp',
-                    'post-quantum crypto', 'homomorphic encryption', 'federated learning', 'gps-denied navigation',
-                    'quantum sensing', 'differential privacy', 'secure aggregation'
-                ],
-                'headline_metrics': {
-                    'task_accuracy': 97.3,
-                    'latency_ms': 50,
-                    'privacy_leakage': 1e-9
-                },
-                'positioning': (
-                    'Benchmark-setting privacy-preserving embodied AI framework integrating quantum-secure '
-                    'communications, zero-knowledge inference, blockchain-secured federated learning, '
-                    'and quantum-enhanced navigation.'
-                ),
-                'components': {
-                    'quantum_secure_comms': 'QKD-derived keys, one-time-pad channels, post-quantum signatures',
-                    'zk_inference': 'SNARK-based verification of model outputs without revealing inputs',
-                    'fl_blockchain': 'Immutable audit with secure aggregation and privacy budget smart contracts',
-                    'quantum_navigation': 'Cold-atom gyros, NV magnetometers, geomagnetic mapping, VIO fusion'
-                },
-                'benchmarks': {
-                    'indoor_navigation_acc': 98.7,
-                    'multi_agent_acc': 96.5,
-                    'dynamic_env_acc': 95.8,
-                    'gps_denied_acc': 94.5
-                },
-                'connections_to_wei': [
-                    'Builds on rWiFiSLAM loop-closure concepts by adding quantum-enhanced navigation and '
-                    'privacy-preserving telemetry; can use WiFi RTT observations as auxiliary constraints '
-                    'alongside quantum magnetometer/VIO fusion.',
-                    'Wei\'s removal of AP-location requirements complements QEP-VLA\'s deployment in dynamic '
-                    'environments with minimal pre-mapping; both emphasize robust localisation under uncertainty.'
-                ],
-                'talk_tracks': [
-                    'How rWiFiSLAM\'s RTT observation clustering inspires privacy-preserving loop closures '
-                    'without sensitive map disclosure.',
-                    'Why differential privacy alone is insufficient for VLA; QEP-VLA\'s hybrid quantum-classical stack.',
-                    'Operational trade-offs: 50ms real-time budget via optimized PQ crypto and secure tensor ops.'
-                ]
-            }
-        ]
+    @property
+    def is_listening(self):
+        return self.state.get('is_listening')
+        
+    @is_listening.setter
+    def is_listening(self, value):
+        self.state.update(is_listening=bool(value))
+        self.sync_from_state()
+        
+    @property
+    def current_question(self):
+        return self.state.get('current_question')
+        
+    @property
+    def last_response(self):
+        return self.state.get('last_response')
+        
+    @property
+    def response_version(self):
+        return self.state.get('response_version')
         
     def get_local_ip(self):
         """Get local IP address"""
@@ -215,7 +235,10 @@ class IntegratedMainPlatform:
         """Setup web routes for the integrated platform"""
         @self.app.route('/')
         def index():
-            return render_template_string(self.get_main_template())
+            return render_template_string(
+                self.get_main_template(),
+                ws_port=self.ws_port if self.ws_enabled else 0
+            )
             
         @self.app.route('/api/teleprompter/start', methods=['POST'])
         def start_teleprompter():
@@ -265,13 +288,64 @@ class IntegratedMainPlatform:
             
         @self.app.route('/api/teleprompter/status')
         def get_teleprompter_status():
+            return self.snapshots.response('status')
+
+        @self.app.route('/api/teleprompter/pipeline')
+        def get_pipeline_metrics():
+            """Recognition backlog and throughput for this process"""
             return jsonify({
-                'is_listening': self.is_listening,
-                'conversation_count': len(self.conversation_history),
-                'current_question': self.current_question,
-                'last_response': self.last_response
+                'pipeline': self.speech_pipeline.get_metrics(),
+                'capture': self.capture.get_stats() if self.capture is not None else None,
+                'browser_audio': self.audio_ingest.get_stats(),
+                'calibration': self.calibration.get_stats(),
+                'browser_calibration': self.audio_ingest.calibration.get_stats(),
+                'speculation': self.speculative.get_stats()
             })
 
+        @self.app.route('/api/teleprompter/latency')
+        def get_latency_metrics():
+            """Rolling p50/p95/p99 per pipeline stage for this process (ms)"""
+            return jsonify(self.latency.get_stats())
+
+        @self.app.route('/api/teleprompter/rule_pack')
+        def get_rule_pack_info():
+            """Name, version and reload count of the rule pack in service"""
+            return jsonify(self.rule_pack.get_info())
+
+        @self.app.route('/api/teleprompter/classifier')
+        def get_classifier_stats():
+            """Question classifier in use, with CPU time per question against its budget"""
+            return jsonify(self.question_classifier.get_stats())
+
+        @self.app.route('/api/teleprompter/audio', methods=['POST'])
+        def ingest_audio():
+            """Browser microphone audio: raw 16 kHz mono little-endian int16 PCM
+            per request, grouped by ?session=<id>"""
+            mimetype = request.mimetype or 'application/octet-stream'
+            rate = request.mimetype_params.get('rate', '16000')
+            if mimetype not in ('application/octet-stream', 'audio/l16', 'audio/pcm') or rate != '16000':
+                return jsonify({'success': False, 'message': 'Send 16 kHz mono 16-bit PCM'}), 415
+            result = self.ingest_audio(request.args.get('session', ''), request.get_data())
+            status = result.pop('status', 200)
+            return jsonify(result), status
+
+        @self.app.route('/api/teleprompter/events')
+        def teleprompter_events():
+            """Server-Sent Events stream of question, response and status updates.
+            Reconnecting clients resume from Last-Event-ID (header or query)."""
+            last_id = EventBroker.parse_last_event_id(
+                request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+            )
+            stream = self.events.stream(last_id=last_id, snapshot=self.get_event_snapshot)
+            return Response(
+                stream_with_context(stream),
+                mimetype='text/event-stream',
+                headers={
+                    'Cache-Control': 'no-cache',
+                    'X-Accel-Buffering': 'no'
+                }
+            )
+
         # Prevent favicon 404 noise in console
         @self.app.route('/favicon.ico')
         def favicon():
@@ -289,389 +363,397 @@ class IntegratedMainPlatform:
         def list_references():
             """List curated references; optional keyword filtering via ?q=.
             Returns only metadata for UI display."""
-            q = (request.args.get('q') or '').strip().lower()
-            refs = self.paper_references
-            if q:
-                def matches(ref):
-                    blob = ' '.join([
-                        ref['title'], ' '.join(ref['authors']), ' '.join(ref['keywords']), ref['summary']
-                    ]).lower()
-                    return all(token in blob for token in q.split())
-                refs = [r for r in refs if matches(r)]
-            # Project minimal fields for UI
-            projected = [{
-                'id': r['id'], 'title': r['title'], 'authors': r['authors'], 'year': r['year'], 'venue': r['venue']
-            } for r in refs]
-            return jsonify({'count': len(projected), 'results': projected})
+            return jsonify(self.reference_store.list_payload(request.args.get('q') or ''))
             
         @self.app.route('/api/references/<ref_id>')
         def get_reference(ref_id):
-            for r in self.paper_references:
-                if r['id'] == ref_id:
-                    return jsonify(r)
-            return jsonify({'error': 'Reference not found'}), 404
+            reference = self.reference_store.get(ref_id)
+            if reference is None:
+                return jsonify({'error': 'Reference not found'}), 404
+            return jsonify(reference)
 
         @self.app.route('/api/personal_work')
         def list_personal_work():
-            q = (request.args.get('q') or '').strip().lower()
-            works = self.personal_work
-            if q:
-                def matches(w):
-                    blob = ' '.join([
-                        w['title'], w['author'], ' '.join(w['keywords']), w['positioning']
-                    ]).lower()
-                    return all(token in blob for token in q.split())
-                works = [w for w in works if matches(w)]
-            projected = [{
-                'id': w['id'], 'title': w['title'], 'author': w['author'], 'date': w['date']
-            } for w in works]
-            return jsonify({'count': len(projected), 'results': projected})
+            return jsonify(self.personal_work_store.list_payload(request.args.get('q') or ''))
 
         @self.app.route('/api/personal_work/<work_id>')
         def get_personal_work(work_id):
-            for w in self.personal_work:
-                if w['id'] == work_id:
-                    return jsonify(w)
-            return jsonify({'error': 'Work not found'}), 404
+            work = self.personal_work_store.get(work_id)
+            if work is None:
+                return jsonify({'error': 'Work not found'}), 404
+            return jsonify(work)
             
         @self.app.route('/api/teleprompter/conversation')
         def get_conversation():
-            return jsonify(self.conversation_history)
+            """Conversation history; supports ?since=<seq>&limit=N and If-None-Match"""
+            if not request.args:
+                return self.snapshots.response('conversation')
+            return conversation_response(self.conversation_history)
             
         @self.app.route('/api/teleprompter/response')
         def get_current_response():
-            return jsonify({
-                'question': self.current_question,
-                'response': self.last_response,
-                'timestamp': datetime.now().isoformat()
-            })
+            """Current response. With ?since=<version>&wait=<seconds> this is a
+            long poll: it returns as soon as a newer response is published,
+            or with the unchanged one when the wait expires."""
+            since = request.args.get('since', type=int)
+            wait = request.args.get('wait', 0, type=float)
+            if since is not None and wait > 0:
+                self.wait_for_response(since, min(wait, self.LONG_POLL_MAX_WAIT))
+            if self.latency.awaiting_fetch:
+                self.latency.delivered(self._synced_response_version)
+            return self.snapshots.response('response')
             
         @self.app.route('/api/teleprompter/qr')
         def generate_qr():
-            try:
-                url = f"http://{self.local_ip}:{self.web_port}"
-                qr = qrcode.QRCode(version=1, box_size=10, border=4)
-                qr.add_data(url)
-                qr.make(fit=True)
-                
-                img = qr.make_image(fill_color=(0, 255, 136), back_color=(26, 26, 26))
-                
-                # Convert to base64
-                buffer = io.BytesIO()
-                img.save(buffer, format='PNG')
-                img_str = base64.b64encode(buffer.getvalue()).decode()
-                
-                return jsonify({
-                    'success': True,
-                    'qr_code': f'data:image/png;base64,{img_str}',
-                    'url': url
-                })
-            except Exception as e:
-                return jsonify({
-                    'success': False,
-                    'error': str(e)
-                })
+            return jsonify(self.generate_qr_code())
                 
         @self.app.route('/api/teleprompter/check_microphone', methods=['GET', 'POST'])
         def check_microphone():
             """Check microphone permissions and availability"""
-            try:
-                # In cloud deployments there is no server-side microphone.
-                # Honor CLOUD_DEPLOYMENT env var to skip server mic access and rely on client-side getUserMedia.
-                if os.getenv('CLOUD_DEPLOYMENT', '0') == '1':
-                    return jsonify({
-                        'success': True,
-                        'message': 'Backend reachable. Use browser getUserMedia() for mic permission.',
-                        'microphone_available': True,
-                        'client_side': True
-                    })
-                # Local environment: test microphone access
-                with self.microphone as source:
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                return jsonify({
-                    'success': True,
-                    'message': 'Microphone access granted and working',
-                    'microphone_available': True
-                })
-            except Exception as e:
-                return jsonify({
-                    'success': False,
-                    'message': f'Microphone access denied or unavailable: {str(e)}',
-                    'microphone_available': False,
-                    'error': str(e)
-                })
+            return jsonify(self.check_microphone_access())
                 
         @self.app.route('/api/teleprompter/start_listening', methods=['POST'])
         def start_listening():
             """Start the teleprompter listening"""
-            if not self.is_listening:
-                self.is_listening = True
-                # In cloud mode or when microphone is unavailable, do not start server-side audio
-                if self.is_cloud or self.microphone is None:
-                    return jsonify({
-                        'success': True,
-                        'message': 'Teleprompter listening simulated in cloud mode',
-                        'is_listening': True
-                    })
-                else:
-                    # Start audio listening in background thread
-                    threading.Thread(target=self.audio_listening_loop, daemon=True).start()
-                    return jsonify({
-                        'success': True,
-                        'message': 'Teleprompter listening started',
-                        'is_listening': True
-                    })
-            else:
-                return jsonify({
-                    'success': False,
-                    'message': 'Teleprompter is already listening'
-                })
+            return jsonify(self.start_listening())
                 
         @self.app.route('/api/teleprompter/stop_listening', methods=['POST'])
         def stop_listening():
             """Stop the teleprompter listening"""
-            self.is_listening = False
-            return jsonify({
-                'success': True,
-                'message': 'Teleprompter listening stopped',
-                'is_listening': False
-            })
+            return jsonify(self.stop_listening())
                 
+    # Control actions shared by the HTTP routes and the WebSocket transport
+    def generate_qr_code(self):
+        """Generate QR code for mobile access"""
+        try:
+            url = f"http://{self.local_ip}:{self.web_port}"
+            qr = qrcode.QRCode(version=1, box_size=10, border=4)
+            qr.add_data(url)
+            qr.make(fit=True)
+            
+            img = qr.make_image(fill_color=(0, 255, 136), back_color=(26, 26, 26))
+            
+            # Convert to base64
+            buffer = io.BytesIO()
+            img.save(buffer, format='PNG')
+            img_str = base64.b64encode(buffer.getvalue()).decode()
+            
+            return {
+                'success': True,
+                'qr_code': f'data:image/png;base64,{img_str}',
+                'url': url
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+            
+    def check_microphone_access(self):
+        """Check microphone permissions and availability"""
+        try:
+            # In cloud deployments there is no server-side microphone.
+            # Honor CLOUD_DEPLOYMENT env var to skip server mic access and rely on client-side getUserMedia.
+            if os.getenv('CLOUD_DEPLOYMENT', '0') == '1':
+                return {
+                    'success': True,
+                    'message': 'Backend reachable. Use browser getUserMedia() for mic permission.',
+                    'microphone_available': True,
+                    'client_side': True
+                }
+            # Local environment: test microphone access through the shared stream
+            if self.capture is None:
+                raise OSError("No microphone available")
+            if not self.capture.start():
+                raise OSError("Microphone could not be opened")
+            try:
+                # One frame proves audio is flowing; while listening it is peeked, not taken from the segmenter
+                frame, shared = self.capture.probe()
+                if not frame:
+                    raise OSError("Microphone produced no audio")
+                # The listening loop already tracks the floor; a frame of speech would skew it
+                noise_floor = self.calibration.noise_floor if shared else None
+                if not noise_floor:
+                    noise_floor = self.calibration.measure(frame, self.capture.sample_rate)
+            finally:
+                self.capture.stop()
+            return {
+                'success': True,
+                'message': 'Microphone access granted and working',
+                'microphone_available': True,
+                'noise_floor': round(noise_floor, 1)
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Microphone access denied or unavailable: {str(e)}',
+                'microphone_available': False,
+                'error': str(e)
+            }
+            
+    def start_listening(self):
+        """Start the teleprompter listening"""
+        if not self.is_listening:
+            self.is_listening = True
+            # In cloud mode or when microphone is unavailable, do not start server-side audio
+            if self.is_cloud or self.microphone is None:
+                if self.recognizer is not None:
+                    # The page streams its own microphone to /api/teleprompter/audio instead
+                    return {
+                        'success': True,
+                        'message': 'Teleprompter listening to browser audio',
+                        'is_listening': True,
+                        'stream_audio': True
+                    }
+                return {
+                    'success': True,
+                    'message': 'Teleprompter listening simulated in cloud mode',
+                    'is_listening': True
+                }
+            else:
+                # Start audio listening in background thread
+                threading.Thread(target=self.audio_listening_loop, daemon=True).start()
+                return {
+                    'success': True,
+                    'message': 'Teleprompter listening started',
+                    'is_listening': True
+                }
+        else:
+            return {
+                'success': False,
+                'message': 'Teleprompter is already listening'
+            }
+            
+    def stop_listening(self):
+        """Stop the teleprompter listening"""
+        self.is_listening = False
+        return {
+            'success': True,
+            'message': 'Teleprompter listening stopped',
+            'is_listening': False
+        }
+        
     def audio_listening_loop(self):
         """OPTIMIZED audio listening loop for instant responses"""
         logger.info("🚀 Starting OPTIMIZED teleprompter audio listening loop")
-        if self.microphone is None:
+        if self.capture is None:
             logger.info("Cloud mode or microphone unavailable; skipping server-side audio loop.")
             return
         
-        try:
-            # Request microphone permission explicitly
-            logger.info("⚡ Requesting microphone access for instant mode...")
-            with self.microphone as source:
-                logger.info("✅ Microphone access granted! Calibrating for instant response...")
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)  # Faster calibration
-                logger.info("⚡ Microphone calibrated for INSTANT response mode")
-        except Exception as e:
-            logger.error(f"Error setting up microphone: {e}")
+        # Load the recognizer model (if local) before audio starts to queue up
+        self.speech_backend.warm()
+        
+        # One input stream stays open for the whole session; the segmenter reads its buffer
+        logger.info("⚡ Requesting microphone access for instant mode...")
+        if not self.capture.start():
             logger.error("Please ensure microphone permissions are granted in System Preferences > Security & Privacy > Microphone")
             return
+        source = self.capture.source()
+        try:
+            logger.info("✅ Microphone access granted! Listening in INSTANT response mode")
             
-        while self.is_listening:
-            try:
-                with self.microphone as source:
-                    # Optimized for instant response - shorter timeouts
-                    audio = self.recognizer.listen(source, timeout=0.5, phrase_time_limit=5)
-                    
-                # Convert speech to text with instant processing
-                text = self.recognizer.recognize_google(audio)
-                if text:
-                    logger.info(f"⚡ INSTANT speech detected: {text}")
-                    self.process_speech_input(text)
-                    
-            except sr.WaitTimeoutError:
-                continue
-            except sr.UnknownValueError:
-                continue
-            except Exception as e:
-                logger.error(f"Audio processing error: {e}")
-                continue
+            # VAD endpointing ends phrases ~300 ms after the speaker stops, with no fixed length cap;
+            # the noise floor comes from the cached profile and is tracked continuously, so no calibration pause
+            segmenter = StreamingSegmenter(
+                source, self.calibration.detector(source.SAMPLE_RATE),
+                partial_interval=float(os.getenv('SPEECH_PARTIAL_INTERVAL', '0.5')),
+                phrase_ids=self.phrase_ids
+            )
+            # SPEECH_STREAMING=1 also transcribes interim audio while the question is asked
+            on_partial = self.partial_transcriber.offer if self.streaming else None
+            
+            def finish_phrase(phrase_id, audio):
+                self.partial_transcriber.finish(phrase_id)
+                # Recognition runs on the worker pool so listening resumes immediately
+                self.speech_pipeline.submit(audio)
+                
+            while self.is_listening and self.capture.running:
+                try:
+                    segmenter.run(lambda: self.is_listening, on_partial, finish_phrase)
+                except Exception as e:
+                    logger.error(f"Audio processing error: {e}")
+        finally:
+            self.capture.stop()
+            self.calibration.save()
+            
+    def process_partial_transcript(self, text, phrase_id=None):
+        """Show an interim transcript live and pre-build the likely response"""
+        self.events.publish('partial', {'text': text, 'timestamp': datetime.now().isoformat()})
+        self.speculative.speculate(text, phrase_id)
                 
-    def process_speech_input(self, text):
+    def ingest_audio(self, session_id, pcm):
+        """Queue browser-captured PCM for a session; used by HTTP and WebSocket uploads"""
+        if self.recognizer is None:
+            return {'success': False, 'message': 'Speech recognition is not installed', 'status': 503}
+        if not self.is_listening:
+            return {'success': False, 'message': 'Teleprompter is not listening', 'status': 409}
+        try:
+            result = self.audio_ingest.push(session_id, pcm)
+        except ValueError as e:
+            return {'success': False, 'message': str(e), 'status': 400}
+        result['success'] = True
+        return result
+                
+    def get_status_payload(self):
+        """Current teleprompter status as served by /api/teleprompter/status"""
+        state = self.state.get_all()
+        return {
+            'is_listening': state['is_listening'],
+            'conversation_count': len(self.conversation_history),
+            'current_question': state['current_question'],
+            'last_response': state['last_response']
+        }
+        
+    def get_response_payload(self):
+        """Current response as served by /api/teleprompter/response.
+        The timestamp is when the response was published, so it only
+        changes when the response does."""
+        state = self.state.get_all()
+        return {
+            'question': state['current_question'],
+            'response': state['last_response'],
+            'version': state['response_version'],
+            'timestamp': state['response_timestamp']
+        }
+        
+    def get_event_snapshot(self):
+        """Events describing the current state for newly connected SSE clients"""
+        snapshot = [('status', self.get_status_payload())]
+        if self.current_question and self.last_response:
+            snapshot.append(('response', self.get_response_payload()))
+        return snapshot
+        
+    def sync_from_state(self):
+        """Bring this process's caches, event stream and long polls up to date
+        with the state store. Runs after local writes and, with a shared
+        store, whenever another worker commits."""
+        with self._sync_lock:
+            version = self.state.version
+            if version == self._synced_version:
+                return
+            self._synced_version = version
+            self.snapshots.bump(version)
+            
+            for entry in self.conversation_history.since(self._synced_seq):
+                if entry['speaker'] == 'interviewer':
+                    self.events.publish('question', {'question': entry['text'], 'timestamp': entry['timestamp']})
+                self._synced_seq = entry['seq']
+                
+            response = self.get_response_payload()
+            if response['version'] != self._synced_response_version:
+                self._synced_response_version = response['version']
+                self.events.publish('response', response)
+                with self.response_changed:
+                    self.response_changed.notify_all()
+                    
+            self.events.publish('status', self.get_status_payload())
+        
+    def record_delivery(self, event, payload):
+        """First push of a traced response to any client ends its latency trace"""
+        if event == 'response' and self.latency.awaiting_fetch:
+            self.latency.delivered(json.loads(payload).get('version'))
+            
+    def publish_response(self, question, response, timestamp):
+        """Make a new question/response pair current and push it to clients"""
+        self.state.publish_response(question, response, timestamp)
+        self.sync_from_state()
+            
+    def wait_for_response(self, since_version, timeout):
+        """Block until the response version differs from since_version.
+        A client ahead of the server (after a restart) returns immediately."""
+        with self.response_changed:
+            return self.response_changed.wait_for(
+                lambda: self.response_version != since_version, timeout=timeout
+            )
+            
+    def process_speech_input(self, text, phrase_id=None):
         """OPTIMIZED speech input processing for instant responses"""
+        logger.info(f"⚡ INSTANT speech detected: {text}")
         # Add to conversation history
-        self.conversation_history.append({
-            'speaker': 'interviewer',
-            'text': text,
-            'timestamp': datetime.now().isoformat()
-        })
+        self.conversation_history.append('interviewer', text)
+        self.sync_from_state()
         
         # Analyze question and generate intelligent response INSTANTLY
-        response = self.generate_intelligent_response(text)
+        response = self.generate_intelligent_response(text, phrase_id)
         
         if response:
-            self.current_question = text
-            self.last_response = response
-            
             # Add response to conversation history
-            self.conversation_history.append({
-                'speaker': 'assistant',
-                'text': response,
-                'timestamp': datetime.now().isoformat()
-            })
+            answered = self.conversation_history.append('assistant', response)
+            
+            # Push to connected clients immediately instead of waiting for their next poll
+            with self.latency.stage('publish'):
+                self.publish_response(text, response, answered['timestamp'])
+            elapsed = self.latency.published(self.response_version)
             
-            logger.info(f"⚡ INSTANT response generated for: {text[:50]}...")
+            if elapsed is not None:
+                logger.info(f"⚡ INSTANT response generated {elapsed:.0f} ms after speech ended for: {text[:50]}...")
+            else:
+                logger.info(f"⚡ INSTANT response generated for: {text[:50]}...")
             
-    def generate_intelligent_response(self, question):
+    def generate_intelligent_response(self, question, phrase_id=None):
         """Generate intelligent response based on actual question content"""
-        question_lower = question.lower()
+        # Usually already built from a partial transcript while the question was asked
+        with self.latency.stage('respond'):
+            return self.speculative.respond(question, phrase_id)
         
-        # Analyze question type and context
-        question_analysis = self.analyze_question(question)
+    def classify_question(self, question):
+        """Question analysis plus cited reference titles; together they determine the response"""
+        # One pack for the whole question, even if a reload lands halfway through
+        pack = self.rule_pack.current
+        with self.latency.stage('analyze_question'):
+            hits = self.question_classifier.scan(question, pack)
+            question_analysis = self.analyze_question(question, hits)
+        with self.latency.stage('citations'):
+            citations = self.resolve_citations(self.select_citations(question))
+        # The pack generation keeps speculation from committing text built from a replaced pack
+        key = (
+            pack.generation, question_analysis['type'], tuple(question_analysis['topics']),
+            question_analysis['technical_level'], tuple(citations)
+        )
+        return key, (pack, question_analysis, citations)
+        
+    def select_citations(self, question):
+        """Ids of the curated references (including personal work) that best
+        match the question, top-k above the index's minimum score"""
+        return [record_id for record_id, score in self.citation_index.search(question)]
+        
+    def build_response(self, question, context):
+        """Response text for a classified question"""
+        pack, question_analysis, citations = context
         
         # Generate contextual response
-        response = self.generate_local_response(question, question_analysis)
+        with self.latency.stage('generate_local_response'):
+            response = pack.build_response(question_analysis)
         
-        # Lightweight, rule-based citation from curated references
-        citations = []
-        if any(token in question_lower for token in ['wifi', 'rtt', '802.11', 'indoor', 'slam', 'localis']):
-            citations.append('rWifiSLAM-2022')
-        if any(token in question_lower for token in ['federated', 'poison', 'backdoor', 'malicious', 'securefed']):
-            citations.append('SecureFed-2024')
-        # Personal work linkage for privacy/quantum/VLA topics
-        if any(token in question_lower for token in ['privacy', 'quantum', 'vla', 'embodied', 'qkd', 'homomorphic', 'zk', 'federated']):
-            citations.append('QEP-VLA-2025')
         if citations:
-            titles = []
-            for cid in citations:
-                for r in self.paper_references:
-                    if r['id'] == cid:
-                        titles.append(r['title'])
-                for w in self.personal_work:
-                    if w['id'] == cid:
-                        titles.append(w['title'])
-            response += " " + "(Refs: " + "; ".join(titles) + ")"
+            response += " " + "(Refs: " + "; ".join(citations) + ")"
         
         return response
         
-    def analyze_question(self, question):
+    def resolve_citations(self, citations):
+        """Titles for cited reference ids"""
+        records = [self.citation_index.get(cid) for cid in citations]
+        return [record['title'] for record in records if record]
+        
+    def analyze_question(self, question, hits=None):
         """Analyze the question to understand context and type"""
-        question_lower = question.lower()
+        # One pass over the question finds every type, topic and level keyword
+        if hits is None:
+            hits = self.question_classifier.scan(question)
         
         analysis = {
-            'type': 'general',
-            'topics': [],
-            'technical_level': 'intermediate',
+            'type': hits['type'][0] if hits['type'] else 'general',
+            'topics': hits['topics'],
+            'technical_level': hits['level'][0] if hits['level'] else 'intermediate',
             'focus_area': 'general',
             'urgency': 'normal'
         }
-        
-        # Detect question types
-        if any(word in question_lower for word in ['experience', 'background', 'worked', 'done']):
-            analysis['type'] = 'experience'
-        elif any(word in question_lower for word in ['how', 'approach', 'method', 'process']):
-            analysis['type'] = 'methodology'
-        elif any(word in question_lower for word in ['why', 'motivation', 'interest', 'excited']):
-            analysis['type'] = 'motivation'
-        elif any(word in question_lower for word in ['research', 'academic', 'university', 'study']):
-            analysis['type'] = 'academic'
-        elif any(word in question_lower for word in ['challenge', 'problem', 'difficult', 'trouble']):
-            analysis['type'] = 'challenge'
-        elif any(word in question_lower for word in ['team', 'leadership', 'manage', 'mentor']):
-            analysis['type'] = 'leadership'
-            
-        # Detect academic topics
-        academic_topics = {
-            'research': 'Research Methodologies',
-            'academic': 'Academic Collaboration',
-            'ai': 'AI/ML Research',
-            'machine learning': 'AI/ML Research',
-            'innovation': 'Technical Innovation',
-            'collaboration': 'Academic Collaboration',
-            'teaching': 'Academic Teaching',
-            'publication': 'Research Publications',
-            'methodology': 'Research Methodologies'
-        }
-        
-        for keyword, topic in academic_topics.items():
-            if keyword in question_lower:
-                analysis['topics'].append(topic)
-                
-        # Detect technical level
-        if any(word in question_lower for word in ['senior', 'lead', 'professor', 'director']):
-            analysis['technical_level'] = 'senior'
-        elif any(word in question_lower for word in ['junior', 'basic', 'simple']):
-            analysis['technical_level'] = 'junior'
             
         return analysis
         
     def generate_local_response(self, question, analysis):
-        """Generate intelligent response using local models and context"""
-        
-        # Build context-aware response based on analysis
-        response_parts = []
-        
-        # Start with acknowledgment
-        response_parts.append("That's a great question.")
-        
-        # Add context-specific response
-        if analysis['type'] == 'experience':
-            response_parts.append(self.generate_experience_response(question, analysis))
-        elif analysis['type'] == 'methodology':
-            response_parts.append(self.generate_methodology_response(question, analysis))
-        elif analysis['type'] == 'motivation':
-            response_parts.append(self.generate_motivation_response(question, analysis))
-        elif analysis['type'] == 'academic':
-            response_parts.append(self.generate_academic_response(question, analysis))
-        elif analysis['type'] == 'challenge':
-            response_parts.append(self.generate_challenge_response(question, analysis))
-        elif analysis['type'] == 'leadership':
-            response_parts.append(self.generate_leadership_response(question, analysis))
-        else:
-            response_parts.append(self.generate_general_response(question, analysis))
-            
-        # Add specific technical details if relevant
-        if analysis['topics']:
-            response_parts.append(self.add_technical_details(analysis['topics']))
-            
-        # Add personal connection
-        response_parts.append(self.add_personal_connection(question, analysis))
-        
-        return " ".join(response_parts)
-        
-    def generate_experience_response(self, question, analysis):
-        """Generate response for experience questions"""
-        if 'AI/ML Research' in analysis['topics']:
-            return "I have extensive experience in AI/ML research, having completed my MSc in AI and worked on various research projects. I'm particularly interested in the intersection of AI and practical applications, and I've contributed to several research initiatives that bridge academic theory with real-world implementation."
-        elif 'Academic Collaboration' in analysis['topics']:
-            return "I have significant experience in academic collaboration, having worked with research teams and contributed to knowledge sharing initiatives. I believe in the power of collaborative research and have experience in both leading and participating in academic projects."
-        else:
-            return "I have extensive experience in AI/ML research, academic collaboration, and technical innovation. My background combines deep technical expertise with proven research skills, having contributed to various academic and research initiatives."
-            
-    def generate_methodology_response(self, question, analysis):
-        """Generate response for methodology questions"""
-        if 'Research Methodologies' in analysis['topics']:
-            return "My approach to research focuses on rigorous methodology, clear documentation, and reproducible results. I establish clear research questions early, use systematic approaches to data collection and analysis, and ensure that findings can be validated and built upon by others in the academic community."
-        else:
-            return "I believe in systematic approaches that balance innovation with rigor. I establish clear methodologies early, use evidence-based decision making, and maintain high standards for research quality and academic integrity."
-            
-    def generate_motivation_response(self, question, analysis):
-        """Generate response for motivation questions"""
-        return "I'm motivated by the opportunity to contribute to cutting-edge research and academic excellence. Newcastle University's reputation for innovation and research excellence aligns perfectly with my passion for advancing knowledge in AI/ML and contributing to the academic community."
-        
-    def generate_academic_response(self, question, analysis):
-        """Generate response for academic questions"""
-        return "I'm deeply committed to academic excellence and research contribution. My MSc in AI has provided me with a strong foundation in research methodologies, and I'm excited about the opportunity to contribute to Newcastle University's research initiatives and academic community."
-        
-    def generate_challenge_response(self, question, analysis):
-        """Generate response for challenge questions"""
-        return "I see challenges as opportunities to innovate and contribute to knowledge advancement. I approach them by applying rigorous research methodologies, collaborating with academic peers, and focusing on solutions that advance both theoretical understanding and practical applications."
-            
-    def generate_leadership_response(self, question, analysis):
-        """Generate response for leadership questions"""
-        return "I believe in leading through knowledge sharing, collaborative research, and academic excellence. I focus on mentoring others, contributing to research initiatives, and building strong academic partnerships that advance the field of AI/ML."
-        
-    def generate_general_response(self, question, analysis):
-        """Generate response for general questions"""
-        return "Based on my experience in AI/ML research and academic collaboration, I would approach this by focusing on evidence-based solutions and academic rigor. My background in research methodologies and technical innovation gives me a unique perspective on academic challenges."
-        
-    def add_technical_details(self, topics):
-        """Add specific technical details based on topics"""
-        details = []
-        
-        if 'AI/ML Research' in topics:
-            details.append("In AI/ML research, I focus on rigorous methodology, clear documentation, and reproducible results that contribute to the academic community.")
-        if 'Academic Collaboration' in topics:
-            details.append("For academic collaboration, I emphasize knowledge sharing, peer review, and building strong research partnerships.")
-        if 'Research Methodologies' in topics:
-            details.append("With research methodologies, I prioritize systematic approaches, evidence-based conclusions, and academic integrity.")
-        if 'Technical Innovation' in topics:
-            details.append("My approach to technical innovation combines academic rigor with practical application, ensuring research contributes to both theory and practice.")
-            
-        return " ".join(details) if details else ""
-        
-    def add_personal_connection(self, question, analysis):
-        """Add personal connection to the response"""
-        return "I'm particularly excited about this opportunity because it combines my passion for AI/ML research with the chance to contribute to Newcastle University's academic excellence and research community."
+        """Response text from the loaded rule pack for an analyzed question"""
+        return self.rule_pack.current.build_response(analysis)
         
     def get_main_template(self):
         """Get the main HTML template with integrated teleprompter"""
@@ -2162,20 +2244,26 @@ class IntegratedMainPlatform:
             badge.innerHTML = `<span class="dot"></span>${isOnline ? 'Online' : 'Offline'}`;
         }
 
+        function applyBackendStatus(data) {
+            setLiveStatus(data.is_listening);
+            const startBtn = document.getElementById('startTeleprompter');
+            const stopBtn = document.getElementById('stopTeleprompter');
+            if (data.is_listening) {
+                startBtn?.classList.add('is-active');
+                stopBtn?.classList.remove('is-active');
+            } else {
+                startBtn?.classList.remove('is-active');
+                stopBtn?.classList.remove('is-active');
+            }
+        }
+
         async function refreshBackendStatus() {
+            // Status arrives over the push channel while it is connected
+            if (tpSocket && tpSocket.readyState === WebSocket.OPEN) return;
+            if (window.__tpEvents && window.__tpEvents.readyState === EventSource.OPEN) return;
             try {
                 const res = await fetch('/api/teleprompter/status');
-                const data = await res.json();
-                setLiveStatus(data.is_listening);
-                const startBtn = document.getElementById('startTeleprompter');
-                const stopBtn = document.getElementById('stopTeleprompter');
-                if (data.is_listening) {
-                    startBtn?.classList.add('is-active');
-                    stopBtn?.classList.remove('is-active');
-                } else {
-                    startBtn?.classList.remove('is-active');
-                    stopBtn?.classList.remove('is-active');
-                }
+                applyBackendStatus(await res.json());
             } catch (_) {}
         }
 
@@ -2189,13 +2277,13 @@ class IntegratedMainPlatform:
                     const stopBtn = document.getElementById('stopTeleprompter');
                     try {
                         setButtonLoading(startBtn, true);
-                        const response = await fetch('/api/teleprompter/start_listening', {
+                        const data = await tpCommand('start_listening', '/api/teleprompter/start_listening', {
                             method: 'POST',
                             headers: { 'Content-Type': 'application/json' },
                             body: JSON.stringify({ stealth_mode: stealthMode })
                         });
-                        const data = await response.json();
                         if (data.success) {
+                            if (data.stream_audio) await startBrowserAudio();
                             updateStatus('Live teleprompter activated!');
                             startBtn.classList.add('is-active');
                             stopBtn?.classList.remove('is-active');
@@ -2226,8 +2314,8 @@ class IntegratedMainPlatform:
                     const stopBtn = this;
                     const startBtn = document.getElementById('startTeleprompter');
                     setButtonLoading(stopBtn, true);
-                    fetch('/api/teleprompter/stop_listening', { method: 'POST' })
-                        .then(response => response.json())
+                    stopBrowserAudio();
+                    tpCommand('stop_listening', '/api/teleprompter/stop_listening', { method: 'POST' })
                         .then(data => {
                             if (data.success) {
                                 updateStatus('Teleprompter stopped');
@@ -2250,11 +2338,10 @@ class IntegratedMainPlatform:
                     try {
                         updateStatus('Checking microphone access...');
                         setButtonLoading(btn, true);
-                        const response = await fetch('/api/teleprompter/check_microphone', {
+                        const data = await tpCommand('check_microphone', '/api/teleprompter/check_microphone', {
                             method: 'POST',
                             headers: { 'Content-Type': 'application/json' }
                         });
-                        const data = await response.json();
                         if (data.success) {
                             updateStatus('✅ Microphone access granted and working!');
                             alert(`✅ Microphone access granted and working!\n\nYou can now start the live teleprompter.`);
@@ -2279,8 +2366,7 @@ class IntegratedMainPlatform:
                     const btn = this;
                     try {
                         setButtonLoading(btn, true);
-                        const response = await fetch('/api/teleprompter/qr');
-                        const data = await response.json();
+                        const data = await tpCommand('qr', '/api/teleprompter/qr');
                         if (data.success) {
                             document.getElementById('qrCodeContainer').innerHTML = `
                                 <img src="${data.qr_code}" alt="QR Code">
@@ -2356,28 +2442,39 @@ class IntegratedMainPlatform:
         }
 
         // Auto-refresh teleprompter data
-        async function fetchTeleprompterData() {
-            try {
-                const response = await fetch('/api/teleprompter/response');
-                const data = await response.json();
-                
-                if (data.timestamp !== lastUpdate) {
-                    lastUpdate = data.timestamp;
-                    if (data.question && data.response) {
-                        updateTeleprompterDisplay(data);
+        // Long poll: the server holds the request until a newer response exists
+        let responseVersion = null;
+        async function fetchTeleprompterData(loopToken) {
+            // Exits once stopPolling() (or a newer loop) replaces the token
+            while (window.__tpIntervals.data === loopToken) {
+                try {
+                    const query = responseVersion === null ? '' : `?since=${responseVersion}&wait=25`;
+                    const response = await fetch(`/api/teleprompter/response${query}`);
+                    const data = await response.json();
+                    if (data.version === responseVersion) continue;
+                    responseVersion = data.version;
+                    handleTeleprompterResponse(data);
+                    
+                    // Fetch only conversation entries added since the last poll
+                    const historyResponse = await fetch(`/api/teleprompter/conversation?since=${conversationSince}`);
+                    updateConversationHistory(await historyResponse.json());
+                    
+                } catch (error) {
+                    // Network fluctuations are okay during restarts; log once per 5s window
+                    if (!window.__lastTpErr || Date.now() - window.__lastTpErr > 5000) {
+                        console.error('Error fetching teleprompter data:', error);
+                        window.__lastTpErr = Date.now();
                     }
+                    await new Promise(resolve => setTimeout(resolve, 2000));
                 }
-                
-                // Fetch conversation history
-                const historyResponse = await fetch('/api/teleprompter/conversation');
-                const historyData = await historyResponse.json();
-                updateConversationHistory(historyData);
-                
-            } catch (error) {
-                // Network fluctuations are okay during restarts; log once per 5s window
-                if (!window.__lastTpErr || Date.now() - window.__lastTpErr > 5000) {
-                    console.error('Error fetching teleprompter data:', error);
-                    window.__lastTpErr = Date.now();
+            }
+        }
+
+        function handleTeleprompterResponse(data) {
+            if (data.timestamp !== lastUpdate) {
+                lastUpdate = data.timestamp;
+                if (data.question && data.response) {
+                    updateTeleprompterDisplay(data);
                 }
             }
         }
@@ -2422,16 +2519,209 @@ class IntegratedMainPlatform:
             }
         }
 
-        // Update conversation history
-        function updateConversationHistory(history) {
+        // Update conversation history from a cursor page
+        let conversationSince = 0;
+        // Store epoch the cursor belongs to; a new one means a restarted server
+        let conversationEpoch = null;
+        function updateConversationHistory(page) {
+            // Restarted servers begin a fresh sequence, even one already past our cursor
+            const restarted = (conversationEpoch !== null && page.epoch !== conversationEpoch) || page.last_seq < conversationSince;
+            conversationEpoch = page.epoch;
+            conversationSince = restarted ? 0 : page.next_since;
             // This would update a conversation history section if needed
         }
 
         // Auto-refresh
         // Avoid creating duplicate intervals on hot reloads or repeated inits
         window.__tpIntervals ||= {};
-        if (!window.__tpIntervals.data) window.__tpIntervals.data = setInterval(fetchTeleprompterData, 1000);
-        if (!window.__tpIntervals.status) window.__tpIntervals.status = setInterval(refreshBackendStatus, 1200);
+        function startPolling() {
+            if (!window.__tpIntervals.data) {
+                window.__tpIntervals.data = {};
+                fetchTeleprompterData(window.__tpIntervals.data);
+            }
+            if (!window.__tpIntervals.status) window.__tpIntervals.status = setInterval(refreshBackendStatus, 1200);
+        }
+
+        function stopPolling() {
+            clearInterval(window.__tpIntervals.status);
+            window.__tpIntervals.data = null;
+            window.__tpIntervals.status = null;
+        }
+
+        function dispatchTeleprompterEvent(event, data) {
+            if (event === 'response') {
+                handleTeleprompterResponse(data);
+            } else if (event === 'status') {
+                applyBackendStatus(data);
+            } else if (event === 'question') {
+                // The final transcript replaces any interim one
+                updateStatus(`🎤 Question detected: ${data.question}`);
+            } else if (event === 'partial') {
+                updateStatus(`🎤 Hearing: ${data.text}…`);
+            }
+        }
+
+        // Server push: updates arrive as soon as a response exists; polling is only a fallback
+        function connectTeleprompterEvents() {
+            if (tpSocket) return;
+            if (!window.EventSource) {
+                startPolling();
+                return;
+            }
+            if (window.__tpEvents) return;
+            const source = new EventSource('/api/teleprompter/events');
+            window.__tpEvents = source;
+            source.addEventListener('open', stopPolling);
+            ['response', 'status', 'question', 'partial'].forEach(name => {
+                source.addEventListener(name, e => dispatchTeleprompterEvent(name, JSON.parse(e.data)));
+            });
+            source.addEventListener('error', () => {
+                // EventSource reconnects on its own (resuming via Last-Event-ID);
+                // poll meanwhile, and permanently if the browser gave up.
+                startPolling();
+                if (source.readyState === EventSource.CLOSED) {
+                    window.__tpEvents = null;
+                    setTimeout(connectTeleprompterEvents, 5000);
+                }
+            });
+        }
+
+        function closeEventStream() {
+            if (window.__tpEvents) {
+                window.__tpEvents.close();
+                window.__tpEvents = null;
+            }
+        }
+
+        // WebSocket transport: one session carries commands up and events down.
+        // SSE/polling take over while it is disconnected.
+        const TP_WS_PORT = Number('{{ ws_port }}') || 0;
+        let tpSocket = null;
+        let tpSocketRetryMs = 1000;
+        let tpSocketLastMessage = 0;
+        let tpCommandSeq = 0;
+        let tpLastEventId = null;
+        const tpPendingCommands = new Map();
+
+        function connectTeleprompterSocket() {
+            if (!TP_WS_PORT || !window.WebSocket) return false;
+            const scheme = location.protocol === 'https:' ? 'wss' : 'ws';
+            const socket = new WebSocket(`${scheme}://${location.hostname}:${TP_WS_PORT}`);
+            socket.addEventListener('open', () => {
+                tpSocket = socket;
+                tpSocketRetryMs = 1000;
+                tpSocketLastMessage = Date.now();
+                socket.send(JSON.stringify({ type: 'hello', last_event_id: tpLastEventId }));
+                closeEventStream();
+                stopPolling();
+            });
+            socket.addEventListener('message', e => {
+                tpSocketLastMessage = Date.now();
+                const msg = JSON.parse(e.data);
+                if (msg.type === 'event') {
+                    if (!msg.snapshot && tpLastEventId !== null && msg.id <= tpLastEventId) return;
+                    tpLastEventId = msg.id;
+                    dispatchTeleprompterEvent(msg.event, msg.data);
+                } else if (msg.type === 'result' && tpPendingCommands.has(msg.id)) {
+                    tpPendingCommands.get(msg.id).resolve(msg.data);
+                    tpPendingCommands.delete(msg.id);
+                }
+            });
+            socket.addEventListener('close', () => {
+                if (tpSocket === socket) tpSocket = null;
+                tpPendingCommands.forEach(p => p.reject(new Error('Connection lost')));
+                tpPendingCommands.clear();
+                connectTeleprompterEvents();
+                setTimeout(connectTeleprompterSocket, tpSocketRetryMs);
+                tpSocketRetryMs = Math.min(tpSocketRetryMs * 2, 30000);
+            });
+            return true;
+        }
+
+        // Client heartbeat; the server answers pings and sends its own when idle
+        setInterval(() => {
+            if (!tpSocket || tpSocket.readyState !== WebSocket.OPEN) return;
+            if (Date.now() - tpSocketLastMessage > 45000) {
+                tpSocket.close();
+                return;
+            }
+            tpSocket.send(JSON.stringify({ type: 'ping' }));
+        }, 20000);
+
+        // Run a control action over the WebSocket session, or HTTP when it is down
+        function tpCommand(action, url, options) {
+            if (tpSocket && tpSocket.readyState === WebSocket.OPEN) {
+                return new Promise((resolve, reject) => {
+                    const id = ++tpCommandSeq;
+                    tpPendingCommands.set(id, { resolve, reject });
+                    tpSocket.send(JSON.stringify({ type: 'command', id: id, action: action }));
+                });
+            }
+            return fetch(url, options).then(response => response.json());
+        }
+
+        // Cloud mode: the server has no microphone, so stream this one as 16 kHz PCM,
+        // over the WebSocket when it is up and by ordered POSTs otherwise
+        const TP_AUDIO_RATE = 16000;
+        let tpAudio = null;
+
+        function toPcm16(samples, fromRate) {
+            const ratio = fromRate / TP_AUDIO_RATE;
+            const pcm = new Int16Array(Math.floor(samples.length / ratio));
+            for (let i = 0; i < pcm.length; i++) {
+                const s = Math.max(-1, Math.min(1, samples[Math.floor(i * ratio)]));
+                pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff;
+            }
+            return pcm;
+        }
+
+        async function startBrowserAudio() {
+            if (tpAudio) return;
+            const stream = await navigator.mediaDevices.getUserMedia({
+                audio: { channelCount: 1, echoCancellation: true, noiseSuppression: true }
+            });
+            const AudioCtx = window.AudioContext || window.webkitAudioContext;
+            let ctx;
+            try {
+                ctx = new AudioCtx({ sampleRate: TP_AUDIO_RATE });
+            } catch (_) {
+                ctx = new AudioCtx();
+            }
+            const input = ctx.createMediaStreamSource(stream);
+            const processor = ctx.createScriptProcessor(4096, 1, 1);
+            const audio = {
+                stream, ctx, input, processor,
+                session: 'b' + Math.random().toString(36).slice(2, 14),
+                uploads: Promise.resolve()
+            };
+            processor.onaudioprocess = e => {
+                const pcm = toPcm16(e.inputBuffer.getChannelData(0), ctx.sampleRate);
+                if (tpSocket && tpSocket.readyState === WebSocket.OPEN) {
+                    tpSocket.send(pcm.buffer);
+                    return;
+                }
+                audio.uploads = audio.uploads.then(() => fetch(`/api/teleprompter/audio?session=${audio.session}`, {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/octet-stream' },
+                    body: pcm.buffer
+                })).catch(() => {});
+            };
+            input.connect(processor);
+            processor.connect(ctx.destination);
+            tpAudio = audio;
+        }
+
+        function stopBrowserAudio() {
+            if (!tpAudio) return;
+            tpAudio.processor.disconnect();
+            tpAudio.input.disconnect();
+            tpAudio.stream.getTracks().forEach(track => track.stop());
+            tpAudio.ctx.close();
+            tpAudio = null;
+        }
+
+        connectTeleprompterEvents();
+        connectTeleprompterSocket();
 
         // Theme color definitions
         const themes = {
@@ -2644,6 +2934,7 @@ class IntegratedMainPlatform:
             
         self.web_thread = threading.Thread(target=run_server, daemon=True)
         self.web_thread.start()
+        self.ws_enabled = self.socket_server.start()
         
         # Wait a moment for server to start
         time.sleep(1)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Keyword Matcher
+Compiles question-classification keyword rules into one trie-shaped
+regular expression, so a single pass over a question finds every type,
+topic, level and citation hit
+"""
+import logging
+import re
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Keywords this short only match whole words ('ai' must not fire on 'said')
+WHOLE_WORD_MAX = 3
+
+
+def _trie_pattern(words):
+    """Regex equivalent to an alternation of ``words``, factored by shared
+    prefixes so each position is tried in time bounded by keyword length"""
+    root = {}
+    for word in words:
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # Greedy optional: the longest keyword wins, shorter ones are the fallback
+        return f'(?:{body})?' if '' in node else body
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """Matches many keyword rules against text in one scan.
+
+    Keywords match at the start of a word and may continue into it
+    ('method' matches 'methods', 'localis' matches 'localisation'); keywords
+    of up to three letters must be the whole word, optionally plural. A
+    trailing '*' forces prefix matching and a leading '=' whole-word
+    matching. ``scan(text)`` returns every category with its matched labels
+    in rule order."""
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.categories = list(rules)
+        # keyword -> set of (category, rank, label)
+        stems, words, labels = set(), set(), {}
+        for category, entries in rules.items():
+            for rank, (label, keywords) in enumerate(entries):
+                for keyword in keywords:
+                    keyword = keyword.lower().strip()
+                    if keyword.startswith('='):
+                        keyword = keyword[1:]
+                        words.add(keyword)
+                    elif keyword.endswith('*'):
+                        keyword = keyword[:-1]
+                        stems.add(keyword)
+                    elif len(keyword) <= WHOLE_WORD_MAX:
+                        words.add(keyword)
+                    else:
+                        stems.add(keyword)
+                    labels.setdefault(keyword, set()).add((category, rank, label))
+        # A matched keyword also carries the labels of every shorter stem it starts with
+        self._hits = {}
+        for keyword in labels:
+            hits = set(labels[keyword])
+            for stem in stems:
+                if stem != keyword and keyword.startswith(stem):
+                    hits |= labels[stem]
+            self._hits[keyword] = hits
+        alternatives = []
+        if words:
+            alternatives.append(f"(?P<word>{_trie_pattern(words)})s?\\b")
+        if stems:
+            alternatives.append(f"(?P<stem>{_trie_pattern(stems)})")
+        # Zero-width lookahead at every word start, so keywords inside a longer match are still seen
+        self._pattern = re.compile(r'(?<!\w)(?=' + '|'.join(alternatives) + ')') if alternatives else None
+        self.keyword_count = len(labels)
+
+    def scan(self, text):
+        """{category: [labels]} for one pass over ``text``"""
+        result = {category: [] for category in self.categories}
+        if self._pattern is None:
+            return result
+        keywords = {match.group(match.lastgroup) for match in self._pattern.finditer(text.lower())}
+        if not keywords:
+            return result
+        found = set().union(*(self._hits[keyword] for keyword in keywords))
+        for category, rank, label in sorted(found):
+            if label not in result[category]:
+                result[category].append(label)
+        return result
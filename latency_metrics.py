@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Latency Metrics
+Monotonic per-utterance timings through the speech-to-suggestion pipeline,
+aggregated into rolling p50/p95/p99 summaries per stage
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Derived spans: name -> (from mark, to mark)
+SPANS = {
+    'queue_wait': ('captured', 'asr_start'),
+    'asr': ('asr_start', 'asr_end'),
+    'ordering_wait': ('asr_end', 'processing'),
+    'processing': ('processing', 'published'),
+    'speech_to_publish': ('captured', 'published'),
+    'publish_to_first_fetch': ('published', 'first_fetch'),
+    'speech_to_first_fetch': ('captured', 'first_fetch'),
+}
+
+
+class RollingWindow:
+    """Last ``size`` samples of one measurement, summarized on demand"""
+
+    def __init__(self, size):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        ordered = sorted(self.samples)
+        n = len(ordered)
+
+        def percentile(p):
+            # Nearest rank
+            return round(ordered[min(n - 1, int(p / 100.0 * n))], 3)
+
+        return {
+            'count': self.count,
+            'window': n,
+            'mean': round(sum(ordered) / n, 3),
+            'p50': percentile(50),
+            'p95': percentile(95),
+            'p99': percentile(99),
+            'max': round(ordered[-1], 3)
+        }
+
+
+class LatencyTracker:
+    """Collects stage timings (milliseconds) for each utterance.
+
+    The recognition pipeline calls ``begin(captured=..., asr_start=...,
+    asr_end=...)`` on the thread that then handles the transcript; code on
+    that thread times its work with ``stage(name)`` and closes the trace
+    with ``published(key)``. The first ``delivered(key)`` afterwards (any
+    client transport) completes it. Stages timed outside a trace, e.g.
+    speculative work on partial transcripts, still count toward their own
+    stage. Each measurement keeps the last LATENCY_WINDOW samples."""
+
+    def __init__(self, window=None, pending_limit=64):
+        self.window = window or int(os.getenv('LATENCY_WINDOW', '1000'))
+        self.pending_limit = pending_limit
+        self._windows = {}
+        self._pending = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _record(self, name, milliseconds):
+        with self._lock:
+            window = self._windows.get(name)
+            if window is None:
+                window = self._windows[name] = RollingWindow(self.window)
+            window.add(milliseconds)
+
+    def _record_spans(self, marks):
+        for name, (start, end) in SPANS.items():
+            if start in marks and end in marks:
+                self._record(name, (marks[end] - marks[start]) * 1000.0)
+
+    def begin(self, **marks):
+        """Start this thread's trace from time.monotonic() marks"""
+        marks['processing'] = time.monotonic()
+        self._local.marks = marks
+
+    @property
+    def current(self):
+        return getattr(self._local, 'marks', None)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; always recorded, and part of this thread's trace if any"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record(name, (time.monotonic() - started) * 1000.0)
+
+    def published(self, key):
+        """The response is out; close the trace and wait for its first fetch under ``key``"""
+        marks = self.current
+        self._local.marks = None
+        if marks is None:
+            return None
+        marks['published'] = time.monotonic()
+        self._record_spans(marks)
+        with self._lock:
+            self._pending[key] = marks
+            while len(self._pending) > self.pending_limit:
+                self._pending.popitem(last=False)
+        return (marks['published'] - marks['captured']) * 1000.0 if 'captured' in marks else None
+
+    @property
+    def awaiting_fetch(self):
+        return bool(self._pending)
+
+    def delivered(self, key):
+        """A client received the response ``key``; only the first delivery counts"""
+        with self._lock:
+            marks = self._pending.pop(key, None)
+        if marks is None:
+            return
+        marks['first_fetch'] = time.monotonic()
+        for name in ('publish_to_first_fetch', 'speech_to_first_fetch'):
+            start, end = SPANS[name]
+            if start in marks:
+                self._record(name, (marks[end] - marks[start]) * 1000.0)
+
+    def get_stats(self):
+        with self._lock:
+            windows = {name: window.summary() for name, window in sorted(self._windows.items())}
+        return {'unit': 'ms', 'stages': windows}
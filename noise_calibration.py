@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Noise Calibration
+Per-device noise floors remembered between runs, so voice activity
+detection starts with the last good threshold instead of blocking on
+adjust_for_ambient_noise and then never adapting
+"""
+import json
+import logging
+import os
+import threading
+import time
+try:
+    import speech_recognition as sr
+except Exception:
+    sr = None
+from vad import VoiceActivityDetector
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CALIBRATION_FILE = os.path.join(os.path.expanduser('~'), '.qwizzy', 'calibration.json')
+
+# One lock per process; profiles for every device share the file
+_file_lock = threading.Lock()
+
+
+def device_key(microphone):
+    """Stable name for an input, e.g. 'Microphone:MacBook Pro Microphone@16000'"""
+    if microphone is None:
+        return 'browser'
+    index = getattr(microphone, 'device_index', None)
+    name = 'default' if index is None else str(index)
+    if sr is not None and isinstance(microphone, sr.Microphone) and index is not None:
+        try:
+            name = sr.Microphone.list_microphone_names()[index]
+        except Exception:
+            pass
+    elif getattr(microphone, 'paths', None):
+        name = os.path.basename(os.path.normpath(microphone.paths[0]))
+    return f"{type(microphone).__name__}:{name}@{getattr(microphone, 'SAMPLE_RATE', 16000)}"
+
+
+def _load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profiles = json.load(f)
+        return profiles if isinstance(profiles, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+class NoiseCalibration:
+    """Cached noise floor for one input device.
+
+    ``detector()`` builds a VoiceActivityDetector seeded with the stored
+    floor; the detector keeps tracking the floor from non-speech audio and
+    reports it back, and the profile is rewritten at most every
+    ``save_interval`` seconds when it has moved noticeably. Profiles live in
+    NOISE_CALIBRATION_FILE (default ~/.qwizzy/calibration.json)."""
+
+    def __init__(self, device, path=None, save_interval=30.0):
+        self.device = device
+        self.path = path or os.getenv('NOISE_CALIBRATION_FILE', DEFAULT_CALIBRATION_FILE)
+        self.save_interval = save_interval
+        profile = _load(self.path).get(device) or {}
+        self.noise_floor = profile.get('noise_floor')
+        self._saved_floor = self.noise_floor
+        self._saved_at = time.monotonic()
+        if self.noise_floor:
+            logger.info(f"🎚️ Noise floor {self.noise_floor:.0f} restored for {device}")
+
+    @classmethod
+    def for_source(cls, microphone, **kwargs):
+        return cls(device_key(microphone), **kwargs)
+
+    def detector(self, sample_rate=16000):
+        """VAD seeded from the cached profile that keeps the profile current"""
+        vad = VoiceActivityDetector(sample_rate, noise_floor=self.noise_floor)
+        vad.on_noise_floor = self.observe
+        return vad
+
+    def observe(self, noise_floor):
+        """Latest floor from the detector; persisted when due"""
+        self.noise_floor = noise_floor
+        if time.monotonic() - self._saved_at >= self.save_interval:
+            self.save()
+
+    def measure(self, frame, sample_rate=16000):
+        """Update the floor from one frame of int16 PCM (device check, no blocking)"""
+        vad = self.detector(sample_rate)
+        vad.classify(frame)
+        self.observe(vad.noise_floor)
+        return self.noise_floor
+
+    def save(self):
+        """Write the profile if the floor changed by more than 10% since the last write"""
+        self._saved_at = time.monotonic()
+        floor = self.noise_floor
+        if not floor or (self._saved_floor and abs(floor - self._saved_floor) <= 0.1 * self._saved_floor):
+            return False
+        try:
+            with _file_lock:
+                profiles = _load(self.path)
+                profiles[self.device] = {'noise_floor': round(floor, 2), 'updated': time.time()}
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                tmp = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp, 'w', encoding='utf-8') as f:
+                    json.dump(profiles, f, indent=2, sort_keys=True)
+                os.replace(tmp, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save noise calibration to {self.path}: {e}")
+            return False
+        self._saved_floor = floor
+        return True
+
+    def get_stats(self):
+        return {'device': self.device, 'noise_floor': self.noise_floor}
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Reference Corpus
+Ingests BibTeX, JSON and Markdown reference libraries into one compact
+file that every worker opens read-only through mmap, so the reading list
+lives once in the page cache instead of once per process
+"""
+import argparse
+import json
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIBRARY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'references')
+DEFAULT_CORPUS_PATH = os.path.join(os.path.expanduser('~'), '.qwizzy', 'references.corpus')
+
+# File layout (little endian):
+#   header    magic, version, record count, entries offset, order offset, manifest offset
+#   records   per record: id bytes, then the record as UTF-8 JSON
+#   entries   one (record offset, id length, JSON length, kind) per record, sorted by id
+#   order     entry numbers in ingestion order, for listings
+#   manifest  UTF-8 JSON of the library it was built from, to the end of the file
+MAGIC = b'QWZREFS\0'
+VERSION = 2
+HEADER = struct.Struct('<8sIIQQQ')
+ENTRY = struct.Struct('<QHIB3x')
+ORDER = struct.Struct('<I')
+KINDS = ('paper', 'personal')
+
+# BibTeX fields carried over as-is; the rest are mapped below or dropped
+BIBTEX_FIELDS = ('title', 'doi', 'url', 'abstract')
+
+
+def _split_list(value):
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [part.strip() for part in re.split(r'[;,]', str(value)) if part.strip()]
+
+
+def _bibtex_value(text, pos):
+    """Parse one {braced}, "quoted" or bare value starting at ``pos``; returns (value, end)"""
+    if text[pos] == '{':
+        depth, start = 0, pos + 1
+        for end in range(pos, len(text)):
+            if text[end] == '{':
+                depth += 1
+            elif text[end] == '}':
+                depth -= 1
+                if depth == 0:
+                    return text[start:end], end + 1
+        raise ValueError("unbalanced braces")
+    if text[pos] == '"':
+        end = text.index('"', pos + 1)
+        return text[pos + 1:end], end + 1
+    match = re.compile(r'[^,}\s]+').match(text, pos)
+    return match.group(0), match.end()
+
+
+def parse_bibtex(text):
+    """Reference records from the @article/@inproceedings/... entries in ``text``"""
+    records = []
+    for entry in re.finditer(r'@(\w+)\s*\{\s*([^,\s]+)\s*,', text):
+        kind = entry.group(1).lower()
+        if kind in ('comment', 'preamble', 'string'):
+            continue
+        fields, pos = {}, entry.end()
+        field = re.compile(r'\s*(\w[\w-]*)\s*=\s*')
+        while True:
+            match = field.match(text, pos)
+            if not match:
+                break
+            value, pos = _bibtex_value(text, match.end())
+            fields[match.group(1).lower()] = ' '.join(value.replace('{', '').replace('}', '').split())
+            pos = re.compile(r'\s*,?').match(text, pos).end()
+        record = {'id': entry.group(2)}
+        record.update({key: fields[key] for key in BIBTEX_FIELDS if key in fields})
+        if 'author' in fields:
+            record['authors'] = [name.strip() for name in fields['author'].split(' and ') if name.strip()]
+        if fields.get('year', '').isdigit():
+            record['year'] = int(fields['year'])
+        venue = fields.get('journal') or fields.get('booktitle') or fields.get('publisher')
+        if not venue and fields.get('eprint'):
+            venue = f"{fields.get('archiveprefix', 'arXiv')}:{fields['eprint']}"
+        if venue:
+            record['venue'] = venue
+        if 'keywords' in fields:
+            record['keywords'] = _split_list(fields['keywords'])
+        if 'abstract' in record:
+            record['summary'] = record.pop('abstract')
+        record['kind'] = fields.get('kind', 'paper')
+        records.append(record)
+    return records
+
+
+def parse_markdown(text, default_id):
+    """One record from a Markdown note: optional ``---`` front matter of
+    ``key: value`` lines, a ``# Title`` heading and the body as summary"""
+    record, body = {}, text
+    match = re.match(r'---\s*\n(.*?)\n---\s*\n', text, re.S)
+    if match:
+        body = text[match.end():]
+        for line in match.group(1).splitlines():
+            key, sep, value = line.partition(':')
+            if sep and value.strip():
+                value = value.strip()
+                if value.startswith('[') and value.endswith(']'):
+                    value = _split_list(value[1:-1])
+                record[key.strip().lower()] = value
+    heading = re.search(r'^#\s+(.+)$', body, re.M)
+    if heading:
+        record.setdefault('title', heading.group(1).strip())
+        body = body[:heading.start()] + body[heading.end():]
+    # Bullets become highlights, the remaining prose the summary
+    bullets = [line.strip()[2:].strip() for line in body.splitlines() if line.strip()[:2] in ('- ', '* ')]
+    prose = ' '.join(line.strip() for line in body.splitlines() if line.strip() and line.strip()[:2] not in ('- ', '* '))
+    if bullets:
+        record.setdefault('highlights', bullets)
+    if prose:
+        record.setdefault('summary', prose)
+    for key in ('authors', 'keywords', 'highlights'):
+        if key in record:
+            record[key] = _split_list(record[key])
+    if str(record.get('year', '')).isdigit():
+        record['year'] = int(record['year'])
+    record.setdefault('id', default_id)
+    record.setdefault('kind', 'paper')
+    return record
+
+
+def library_files(paths):
+    """Every .bib, .json and .md file under ``paths``, in ingestion order"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files.extend(os.path.join(root, name) for name in sorted(names))
+        elif os.path.isfile(path):
+            files.append(path)
+    return [f for f in files if os.path.splitext(f)[1].lower() in ('.bib', '.json', '.md')]
+
+
+def library_manifest(paths, pinned=False):
+    """The sources and (path, size, mtime) of every library file; a corpus
+    whose stored manifest differs was built from something else. Sources
+    that no longer exist contribute no files."""
+    files = []
+    for file_path in library_files(paths):
+        stat = os.stat(file_path)
+        files.append([os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns])
+    return {'sources': [os.path.abspath(path) for path in paths], 'pinned': pinned, 'files': files}
+
+
+def read_library(paths):
+    """Records from every .bib, .json and .md file under ``paths``, in file order"""
+    records = []
+    for file_path in library_files(paths):
+        extension = os.path.splitext(file_path)[1].lower()
+        with open(file_path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        try:
+            if extension == '.bib':
+                found = parse_bibtex(text)
+            elif extension == '.json':
+                data = json.loads(text)
+                found = data if isinstance(data, list) else [data]
+            else:
+                found = [parse_markdown(text, os.path.splitext(os.path.basename(file_path))[0])]
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {e}") from e
+        for record in found:
+            if not isinstance(record, dict) or not record.get('id') or not record.get('title'):
+                raise ValueError(f"{file_path}: every reference needs an id and a title")
+            if record.get('kind', 'paper') not in KINDS:
+                raise ValueError(f"{file_path}: {record['id']} has unknown kind '{record['kind']}'")
+        records.extend(found)
+        logger.info(f"📄 {file_path}: {len(found)} references")
+    return records
+
+
+def write_corpus(records, path, manifest=None):
+    """Write ``records`` and the ``manifest`` of their library to ``path``
+    atomically; open readers keep the previous file"""
+    unique = {}
+    for record in records:
+        record = dict(record)
+        kind = KINDS.index(record.pop('kind', 'paper'))
+        if record['id'] in unique:
+            logger.warning(f"Duplicate reference id {record['id']}; keeping the later one")
+            del unique[record['id']]
+        unique[record['id']] = (kind, record)
+    ordered = list(unique)
+    by_id = sorted(ordered, key=lambda record_id: record_id.encode('utf-8'))
+
+    data, offsets = bytearray(), {}
+    for record_id in ordered:
+        kind, record = unique[record_id]
+        key = record_id.encode('utf-8')
+        payload = json.dumps(record, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        offsets[record_id] = (HEADER.size + len(data), len(key), len(payload), kind)
+        data += key + payload
+    entries = b''.join(ENTRY.pack(*offsets[record_id]) for record_id in by_id)
+    position = {record_id: n for n, record_id in enumerate(by_id)}
+    order = b''.join(ORDER.pack(position[record_id]) for record_id in ordered)
+    entries_offset = HEADER.size + len(data)
+    order_offset = entries_offset + len(entries)
+    header = HEADER.pack(MAGIC, VERSION, len(ordered), entries_offset, order_offset, order_offset + len(order))
+    manifest = json.dumps(manifest or {}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.references-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header + data + entries + order + manifest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return len(ordered)
+
+
+class ReferenceCorpus:
+    """Read-only, memory-mapped view of a corpus file.
+
+    Records are decoded only when asked for; ``get`` is a binary search
+    over the id-sorted entry table, and iteration follows ingestion
+    order."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} reference corpus")
+        magic, version, self.count, self._entries, self._order, self._manifest = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} reference corpus")
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, n):
+        return ENTRY.unpack_from(self._mmap, self._entries + n * ENTRY.size)
+
+    def _id(self, entry):
+        offset, id_length = entry[0], entry[1]
+        return self._mmap[offset:offset + id_length]
+
+    def _decode(self, entry):
+        offset, id_length, length = entry[0], entry[1], entry[2]
+        start = offset + id_length
+        return json.loads(self._mmap[start:start + length].decode('utf-8'))
+
+    def _find(self, record_id):
+        key = record_id.encode('utf-8')
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id(self._entry(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.count:
+            entry = self._entry(low)
+            if self._id(entry) == key:
+                return entry
+        return None
+
+    def get(self, record_id):
+        """The record with ``record_id``, or None"""
+        entry = self._find(record_id)
+        return self._decode(entry) if entry is not None else None
+
+    def kind(self, record_id):
+        entry = self._find(record_id)
+        return KINDS[entry[3]] if entry is not None else None
+
+    def records(self, kind=None):
+        """Decoded records in ingestion order, optionally of one kind"""
+        for i in range(self.count):
+            entry = self._entry(ORDER.unpack_from(self._mmap, self._order + i * ORDER.size)[0])
+            if kind is None or KINDS[entry[3]] == kind:
+                yield self._decode(entry)
+
+    def __iter__(self):
+        return self.records()
+
+    @property
+    def manifest(self):
+        """The library manifest stored when the corpus was built"""
+        return json.loads(self._mmap[self._manifest:].decode('utf-8'))
+
+    def get_info(self):
+        counts = {kind: 0 for kind in KINDS}
+        for n in range(self.count):
+            counts[KINDS[self._entry(n)[3]]] += 1
+        manifest = self.manifest
+        return {
+            'path': self.path, 'bytes': len(self._mmap), 'records': self.count, 'kinds': counts,
+            'sources': manifest.get('sources', []), 'pinned': manifest.get('pinned', False),
+            'files': len(manifest.get('files', []))
+        }
+
+    def close(self):
+        self._mmap.close()
+
+
+def build_corpus(sources=None, path=None, pinned=None):
+    """Ingest ``sources`` (default REFERENCE_LIBRARY_DIR) into ``path``
+    (default REFERENCE_CORPUS); returns the number of references written.
+
+    Explicit ``sources`` are pinned: startup keeps the corpus built from
+    them, rebuilding from the same sources when their files change,
+    instead of replacing it with one built from REFERENCE_LIBRARY_DIR."""
+    if pinned is None:
+        pinned = bool(sources)
+    sources = sources or [os.getenv('REFERENCE_LIBRARY_DIR', DEFAULT_LIBRARY_DIR)]
+    path = path or os.getenv('REFERENCE_CORPUS', DEFAULT_CORPUS_PATH)
+    # Taken before reading, so a file changed mid-build triggers the next rebuild
+    manifest = library_manifest(sources, pinned)
+    return write_corpus(read_library(sources), path, manifest)
+
+
+def _stored_manifest(path):
+    """Manifest of the corpus at ``path``; None when it is missing or unreadable"""
+    try:
+        corpus = ReferenceCorpus(path)
+    except (OSError, ValueError):
+        return None
+    try:
+        return corpus.manifest
+    except ValueError:
+        return None
+    finally:
+        corpus.close()
+
+
+def open_reference_corpus(path=None, library=None):
+    """The corpus at REFERENCE_CORPUS, rebuilt first unless its sources'
+    files (names, sizes and mtimes) are exactly those it was built from.
+
+    A corpus built with ``reference_corpus.py build <sources...>`` is
+    revalidated and rebuilt against those sources; any other is rebuilt
+    from REFERENCE_LIBRARY_DIR unless it was built from that directory."""
+    path = path or os.getenv('REFERENCE_CORPUS', DEFAULT_CORPUS_PATH)
+    library = library or os.getenv('REFERENCE_LIBRARY_DIR', DEFAULT_LIBRARY_DIR)
+    stored = _stored_manifest(path)
+    if stored is not None and stored.get('pinned'):
+        sources, pinned = stored['sources'], True
+    elif os.path.isdir(library):
+        sources, pinned = [library], False
+    else:
+        return ReferenceCorpus(path)
+    manifest = library_manifest(sources, pinned)
+    if stored != manifest:
+        logger.info(f"📚 Building reference corpus {path} from {', '.join(sources)}...")
+        try:
+            build_corpus(sources, path, pinned)
+        except OSError as e:
+            # Read-only home (some hosts): build where this machine can write
+            path = os.path.join(tempfile.gettempdir(), 'qwizzy-references.corpus')
+            logger.warning(f"Could not write the reference corpus ({e}); using {path}")
+            if _stored_manifest(path) != manifest:
+                build_corpus(sources, path, pinned)
+    return ReferenceCorpus(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    build = commands.add_parser('build', help='ingest .bib/.json/.md files into a corpus')
+    build.add_argument('sources', nargs='*', help='files or directories (default REFERENCE_LIBRARY_DIR)')
+    build.add_argument('-o', '--output', help='corpus file (default REFERENCE_CORPUS)')
+    info = commands.add_parser('info', help='summarize a corpus')
+    info.add_argument('path', nargs='?')
+    show = commands.add_parser('show', help='print one reference as JSON')
+    show.add_argument('id')
+    show.add_argument('--corpus')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        started = time.monotonic()
+        try:
+            count = build_corpus(args.sources, args.output)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}", file=sys.stderr)
+            sys.exit(1)
+        output = args.output or os.getenv('REFERENCE_CORPUS', DEFAULT_CORPUS_PATH)
+        print(f"✅ {count} references written to {output} in {time.monotonic() - started:.2f}s")
+    elif args.command == 'info':
+        corpus = ReferenceCorpus(args.path or os.getenv('REFERENCE_CORPUS', DEFAULT_CORPUS_PATH))
+        print(json.dumps(corpus.get_info(), indent=2))
+    else:
+        corpus = ReferenceCorpus(args.corpus or os.getenv('REFERENCE_CORPUS', DEFAULT_CORPUS_PATH))
+        record = corpus.get(args.id)
+        if record is None:
+            print(f"❌ No reference {args.id}", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(record, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
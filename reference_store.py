@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Reference Store
+Curated reference records behind an id index and an inverted token index,
+with their list payloads projected once per change rather than per request
+"""
+import bisect
+import logging
+import re
+import threading
+import unicodedata
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Case- and accent-folded text, so 'Localisation' matches 'localisation' and 'é' matches 'e'"""
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text):
+    return WORD_PATTERN.findall(normalize(text))
+
+
+class ReferenceStore:
+    """Records keyed by ``id``, searchable over ``search_fields``.
+
+    Every query word must prefix-match some word of a record ('local'
+    finds 'localisation'); a search walks only the postings of the
+    index terms its words expand to. ``list_payload()`` and ``get()``
+    return structures built when records are added or removed. With
+    ``lookup`` (e.g. a memory-mapped corpus's ``get``) only the indexes
+    stay in memory and full records are fetched on demand."""
+
+    def __init__(self, records, search_fields, list_fields, lookup=None):
+        self.search_fields = search_fields
+        self.list_fields = list_fields
+        self._lookup = lookup
+        self._records = {}
+        self._order = {}
+        self._next = 0
+        # term -> set of record ids
+        self._postings = {}
+        self._terms = []
+        self._projected = {}
+        self._listing = None
+        self._lock = threading.RLock()
+        for record in records:
+            self._add(record)
+        self._rebuild()
+
+    def __len__(self):
+        return len(self._records)
+
+    def _terms_of(self, record):
+        terms = set()
+        for field in self.search_fields:
+            value = record.get(field)
+            if isinstance(value, (list, tuple)):
+                value = ' '.join(str(v) for v in value)
+            if value:
+                terms.update(words(value))
+        return terms
+
+    def _add(self, record):
+        record_id = record['id']
+        if record_id in self._records:
+            self._remove(record_id)
+        self._records[record_id] = record if self._lookup is None else None
+        self._order[record_id] = self._next
+        self._next += 1
+        self._projected[record_id] = {field: record.get(field) for field in self.list_fields}
+        for term in self._terms_of(record):
+            self._postings.setdefault(term, set()).add(record_id)
+
+    def _remove(self, record_id):
+        if record_id not in self._records:
+            return False
+        record = self._records.pop(record_id) or self._lookup(record_id) or {}
+        del self._order[record_id]
+        del self._projected[record_id]
+        for term in self._terms_of(record):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.discard(record_id)
+                if not posting:
+                    del self._postings[term]
+        return True
+
+    def _rebuild(self):
+        self._terms = sorted(self._postings)
+        results = list(self._projected.values())
+        self._listing = {'count': len(results), 'results': results}
+
+    def add(self, record):
+        """Insert or replace a record"""
+        with self._lock:
+            self._add(record)
+            self._rebuild()
+
+    def remove(self, record_id):
+        """Drop a record; False if there was none"""
+        with self._lock:
+            removed = self._remove(record_id)
+            if removed:
+                self._rebuild()
+        return removed
+
+    def get(self, record_id):
+        if self._lookup is None:
+            return self._records.get(record_id)
+        return self._lookup(record_id) if record_id in self._records else None
+
+    def _matching(self, word):
+        """Ids of records with a term starting with ``word``"""
+        terms = self._terms
+        ids = set()
+        for index in range(bisect.bisect_left(terms, word), len(terms)):
+            term = terms[index]
+            if not term.startswith(word):
+                break
+            ids |= self._postings[term]
+        return ids
+
+    def search(self, query):
+        """Ids of records matching every word of ``query``, in insertion order"""
+        with self._lock:
+            candidates = None
+            # Longest words first: they usually have the shortest postings
+            for word in sorted(set(words(query)), key=len, reverse=True):
+                ids = self._matching(word)
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    return []
+            if candidates is None:
+                return list(self._records)
+            return sorted(candidates, key=self._order.__getitem__)
+
+    def list_payload(self, query=''):
+        """{'count', 'results'} of projected records, all of them when ``query`` is blank"""
+        if not words(query):
+            return self._listing
+        with self._lock:
+            results = [self._projected[record_id] for record_id in self.search(query)]
+        return {'count': len(results), 'results': results}
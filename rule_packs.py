@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Rule Packs
+Versioned JSON files holding question-classification keywords and canned
+response text, compiled on load and swapped in atomically when the file
+changes on disk
+"""
+import json
+import logging
+import os
+import threading
+import time
+from keyword_matcher import KeywordMatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULE_PACK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rule_packs')
+CATEGORIES = ('type', 'topics', 'level')
+
+_packs = {}
+_packs_lock = threading.Lock()
+_generation = 0
+
+
+class CompiledRulePack:
+    """A parsed, validated rule pack with its keyword matcher built.
+
+    ``generation`` is unique per load in this process, so anything cached
+    from one version of a pack can tell it is stale."""
+
+    def __init__(self, data, path=None):
+        global _generation
+        self.path = path
+        self.name = data['name']
+        self.version = str(data['version'])
+        self.description = data.get('description', '')
+        rules = data['rules']
+        self.matcher = KeywordMatcher({
+            category: [(entry['label'], entry['keywords']) for entry in rules.get(category, [])]
+            for category in CATEGORIES
+        })
+        responses = data['responses']
+        self.opening = responses.get('opening', '')
+        self.closing = responses.get('closing', '')
+        # type -> [(topics or None, text)]; the first variant whose topics intersect wins
+        self.by_type = {
+            kind: [(frozenset(v['topics']) if v.get('topics') else None, v['text']) for v in variants]
+            for kind, variants in responses['by_type'].items()
+        }
+        self.topic_details = [(d['topic'], d['text']) for d in responses.get('topic_details', [])]
+        # Example questions per label, for classifiers that learn from examples rather than keywords
+        self.exemplars = data.get('exemplars', {})
+        self.thresholds = data.get('thresholds', {})
+        # Derived structures attached by watcher compilers, keyed by compiler name
+        self.compiled = {}
+        self._validate(rules)
+        with _packs_lock:
+            _generation += 1
+            self.generation = _generation
+        self.loaded_at = time.time()
+
+    def _validate(self, rules):
+        """Require a general answer; warn about variants that can never be chosen"""
+        if 'general' not in self.by_type:
+            raise ValueError(f"rule pack {self.name}: responses.by_type needs a 'general' entry")
+        topics = {entry['label'] for entry in rules.get('topics', [])}
+        types = {entry['label'] for entry in rules.get('type', [])} | {'general'}
+        for kind, variants in self.by_type.items():
+            if kind not in types:
+                logger.warning(f"Rule pack {self.name}: no question type '{kind}' to answer")
+            for wanted, _ in variants:
+                for topic in (wanted or frozenset()) - topics:
+                    logger.warning(f"Rule pack {self.name}: '{kind}' response needs unknown topic '{topic}'")
+
+    def scan(self, question):
+        return self.matcher.scan(question)
+
+    def build_response(self, analysis):
+        """Opening, the type-specific answer, topic details and closing"""
+        topics = analysis['topics']
+        parts = [self.opening]
+        variants = self.by_type.get(analysis['type']) or self.by_type['general']
+        for wanted, text in variants:
+            if wanted is None or not wanted.isdisjoint(topics):
+                parts.append(text)
+                break
+        parts.extend(text for topic, text in self.topic_details if topic in topics)
+        parts.append(self.closing)
+        return " ".join(part for part in parts if part)
+
+    def get_info(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'description': self.description,
+            'path': self.path,
+            'generation': self.generation,
+            'keywords': self.matcher.keyword_count,
+            'loaded_at': self.loaded_at
+        }
+
+
+def load_rule_pack(path):
+    """Parse and compile one pack file; raises ValueError when it is invalid"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    try:
+        return CompiledRulePack(data, path)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"{path}: malformed rule pack ({type(e).__name__}: {e})") from e
+
+
+class RulePackWatcher:
+    """Serves the current compiled version of one pack file.
+
+    A daemon thread checks the file's mtime every ``poll_interval`` seconds
+    and compiles a changed file off the request path; ``current`` is a
+    plain attribute read, swapped in one assignment once the new pack has
+    compiled. A pack that fails to load is logged and the previous one
+    stays in service."""
+
+    def __init__(self, path, poll_interval=2.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.current = load_rule_pack(path)
+        self._mtime = self._stat()
+        self.reloads = 0
+        self.errors = 0
+        self._compilers = {}
+        logger.info(f"📚 Rule pack {self.current.name} v{self.current.version} loaded from {path}")
+        if poll_interval:
+            threading.Thread(target=self._watch, name=f"rule-pack-{self.current.name}", daemon=True).start()
+
+    def add_compiler(self, name, compile):
+        """Run ``compile(pack)`` on every pack before it goes live, storing the
+        result in ``pack.compiled[name]``; it runs on the current pack now.
+        A compiler that fails leaves ``None`` there rather than blocking the reload."""
+        self._compilers[name] = compile
+        self._compile(self.current, {name: compile})
+
+    def _compile(self, pack, compilers):
+        for name, compile in compilers.items():
+            try:
+                pack.compiled[name] = compile(pack)
+            except Exception as e:
+                pack.compiled[name] = None
+                logger.error(f"Rule pack {pack.name} v{pack.version}: {name} failed to compile: {e}")
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            self.check()
+
+    def check(self):
+        """Reload if the file changed since the last load; True when a new pack went live"""
+        mtime = self._stat()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            pack = load_rule_pack(self.path)
+        except (OSError, ValueError) as e:
+            self.errors += 1
+            logger.error(f"Rule pack {self.path} not reloaded, keeping v{self.current.version}: {e}")
+            return False
+        self._compile(pack, dict(self._compilers))
+        self.current = pack
+        self.reloads += 1
+        logger.info(f"📚 Rule pack {pack.name} reloaded: v{pack.version}")
+        return True
+
+    def get_info(self):
+        info = self.current.get_info()
+        info.update({'reloads': self.reloads, 'reload_errors': self.errors})
+        return info
+
+
+def get_rule_pack(name):
+    """Shared watcher for ``<RULE_PACK_DIR>/<name>.json``.
+
+    RULE_PACK_DIR defaults to the bundled rule_packs directory;
+    RULE_PACK_POLL_INTERVAL (seconds, 0 disables watching) defaults to 2."""
+    directory = os.getenv('RULE_PACK_DIR', DEFAULT_RULE_PACK_DIR)
+    path = os.path.join(directory, f"{name}.json")
+    with _packs_lock:
+        watcher = _packs.get(path)
+    if watcher is None:
+        watcher = RulePackWatcher(path, float(os.getenv('RULE_PACK_POLL_INTERVAL', '2')))
+        with _packs_lock:
+            watcher = _packs.setdefault(path, watcher)
+    return watcher
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Semantic Question Classifier
+Embeds each question once with a small CPU sentence-embedding model and
+scores it against a precomputed matrix of per-label exemplar centroids,
+chosen with the QUESTION_CLASSIFIER environment variable
+"""
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+try:
+    import numpy as np
+except Exception:
+    np = None
+try:
+    import torch  # type: ignore
+    from transformers import AutoModel, AutoTokenizer  # type: ignore
+except Exception:
+    torch = None
+    AutoModel = AutoTokenizer = None
+from latency_metrics import RollingWindow
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Categories scored by embedding; anything else in a pack stays keyword-matched
+SEMANTIC_CATEGORIES = ('type', 'topics', 'level')
+DEFAULT_THRESHOLDS = {'type': 0.3, 'topics': 0.4, 'level': 0.45}
+
+# Loaded models, shared by every platform instance in the process
+_models = {}
+_models_lock = threading.Lock()
+
+
+class SentenceEmbedder:
+    """Mean-pooled, L2-normalized sentence embeddings from a transformers
+    encoder on CPU (default sentence-transformers/all-MiniLM-L6-v2)"""
+
+    def __init__(self, model_name=None, max_tokens=64):
+        self.model_name = model_name or os.getenv('QUESTION_EMBEDDING_MODEL', 'sentence-transformers/all-MiniLM-L6-v2')
+        self.max_tokens = max_tokens
+
+    @staticmethod
+    def available():
+        return torch is not None and AutoModel is not None and np is not None
+
+    def _model(self):
+        loaded = _models.get(self.model_name)
+        if loaded is not None:
+            return loaded
+        with _models_lock:
+            loaded = _models.get(self.model_name)
+            if loaded is None:
+                logger.info(f"Loading question embedding model {self.model_name} on CPU...")
+                tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                model = AutoModel.from_pretrained(self.model_name)
+                model.eval()
+                loaded = _models[self.model_name] = (tokenizer, model)
+                logger.info(f"✅ Question embedding model {self.model_name} ready")
+        return loaded
+
+    def embed(self, texts):
+        """(len(texts), dim) float32 array of unit vectors"""
+        tokenizer, model = self._model()
+        batch = tokenizer(
+            list(texts), padding=True, truncation=True, max_length=self.max_tokens, return_tensors='pt'
+        )
+        with torch.inference_mode():
+            hidden = model(**batch).last_hidden_state
+            mask = batch['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        vectors = pooled.numpy().astype(np.float32)
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+class CentroidIndex:
+    """Every label's exemplar centroid stacked into one matrix, so scoring a
+    question is one matrix-vector product"""
+
+    def __init__(self, pack, embedder):
+        labels, sentences, owners = [], [], []
+        for category in SEMANTIC_CATEGORIES:
+            for label, examples in pack.exemplars.get(category, {}).items():
+                if examples:
+                    owners.extend([len(labels)] * len(examples))
+                    sentences.extend(examples)
+                    labels.append((category, label))
+        if not labels:
+            raise ValueError("pack has no exemplars")
+        vectors = embedder.embed(sentences)
+        centroids = np.zeros((len(labels), vectors.shape[1]), dtype=np.float32)
+        np.add.at(centroids, np.asarray(owners), vectors)
+        self.matrix = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+        self.labels = labels
+        # category -> (row indices, label names), for per-category ranking
+        self.rows = {}
+        for row, (category, label) in enumerate(labels):
+            indices, names = self.rows.setdefault(category, ([], []))
+            indices.append(row)
+            names.append(label)
+        self.rows = {category: (np.asarray(indices), names) for category, (indices, names) in self.rows.items()}
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **pack.thresholds)
+
+    def rank(self, vector):
+        """{category: [labels]} scoring at or above the category threshold, best first.
+        Type and level are single-label; topics keep every label over threshold."""
+        scores = self.matrix @ vector
+        result = {}
+        for category, (indices, names) in self.rows.items():
+            category_scores = scores[indices]
+            order = np.argsort(-category_scores)
+            passing = [names[i] for i in order if category_scores[i] >= self.thresholds[category]]
+            result[category] = passing if category == 'topics' else passing[:1]
+        return result
+
+
+class SemanticClassifier:
+    """Drop-in replacement for a rule pack's keyword ``scan``.
+
+    Embeds the question once (repeated text, e.g. a final transcript that
+    matches the last partial, comes from an LRU cache), ranks it against
+    the current pack's centroid matrix and fills categories without
+    exemplars from the keyword matcher. The pack's centroids are built by
+    the rule pack watcher before the pack goes live. CPU time per
+    question is tracked against QUESTION_CLASSIFIER_BUDGET_MS at p95."""
+
+    def __init__(self, rule_pack, embedder, cache_size=256, budget_ms=None):
+        self.rule_pack = rule_pack
+        self.embedder = embedder
+        self.cache_size = cache_size
+        self.budget_ms = budget_ms or float(os.getenv('QUESTION_CLASSIFIER_BUDGET_MS', '25'))
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.cpu_ms = RollingWindow(1000)
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self._warned_at = 0
+        rule_pack.add_compiler('semantic', lambda pack: CentroidIndex(pack, embedder))
+
+    def _embedding(self, text):
+        key = " ".join(text.lower().split())
+        with self._lock:
+            vector = self._cache.get(key)
+            if vector is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return vector
+        vector = self.embedder.embed([key])[0]
+        with self._lock:
+            self._cache[key] = vector
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return vector
+
+    def scan(self, question, pack=None):
+        """{category: [labels]} in the same shape as KeywordMatcher.scan"""
+        started = time.thread_time()
+        pack = pack or self.rule_pack.current
+        hits = pack.scan(question)
+        index = pack.compiled.get('semantic')
+        if index is None:
+            # Centroids failed to build for this pack version: keywords only
+            self.fallbacks += 1
+            return hits
+        hits.update(index.rank(self._embedding(question)))
+        with self._lock:
+            self.cpu_ms.add((time.thread_time() - started) * 1000.0)
+            over = self._over_budget()
+        if over is not None:
+            logger.warning(f"Question classifier p95 CPU time {over:.1f} ms exceeds budget {self.budget_ms:.0f} ms")
+        return hits
+
+    def _over_budget(self):
+        """p95 CPU ms when it is over budget and not recently reported, else None"""
+        count = self.cpu_ms.count
+        # Checked every 20 questions once there are enough samples
+        if count < 20 or count % 20 or (self._warned_at and count - self._warned_at < 100):
+            return None
+        p95 = self.cpu_ms.summary()['p95']
+        if p95 <= self.budget_ms:
+            return None
+        self._warned_at = count
+        return p95
+
+    def get_stats(self):
+        with self._lock:
+            cpu = self.cpu_ms.summary() if self.cpu_ms.samples else None
+        return {
+            'classifier': 'semantic',
+            'model': getattr(self.embedder, 'model_name', None),
+            'budget_ms': self.budget_ms,
+            'cpu_ms': cpu,
+            'within_budget': cpu is None or cpu['p95'] <= self.budget_ms,
+            'cache_hits': self.cache_hits,
+            'cached': len(self._cache),
+            'keyword_fallbacks': self.fallbacks
+        }
+
+
+class KeywordClassifier:
+    """The rule pack's keyword matcher behind the classifier interface"""
+
+    def __init__(self, rule_pack):
+        self.rule_pack = rule_pack
+
+    def scan(self, question, pack=None):
+        return (pack or self.rule_pack.current).scan(question)
+
+    def get_stats(self):
+        return {'classifier': 'keywords'}
+
+
+def get_question_classifier(rule_pack, name=None):
+    """Classifier named by ``name`` or QUESTION_CLASSIFIER (keywords|semantic).
+
+    ``semantic`` needs transformers, torch and numpy and falls back to
+    keywords without them."""
+    name = (name or os.getenv('QUESTION_CLASSIFIER', 'keywords')).lower()
+    if name == 'semantic':
+        if SentenceEmbedder.available():
+            return SemanticClassifier(rule_pack, SentenceEmbedder())
+        logger.warning("QUESTION_CLASSIFIER=semantic needs transformers, torch and numpy; using keywords")
+    elif name != 'keywords':
+        logger.warning(f"Unknown QUESTION_CLASSIFIER '{name}'; using keywords")
+    return KeywordClassifier(rule_pack)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Session Journal
+Append-only JSONL journal of teleprompter session changes, written by a
+background thread with group commit, plus periodic snapshots so a restarted
+platform recovers its state without replaying the whole log
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from collections import deque
+try:
+    import fcntl
+except Exception:
+    # No cross-process locking (Windows); keep one process per journal directory
+    fcntl = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILE = 'snapshot.json'
+LOCK_FILE = 'journal.lock'
+
+
+class SessionJournal:
+    """Durable log of state updates and conversation appends.
+
+    ``record()`` only enqueues, so callers on the speech path never wait on
+    disk. The writer thread drains everything queued, writes it as one batch
+    and fsyncs once per batch. It also mirrors the resulting state; every
+    ``snapshot_every`` records that mirror is written to ``snapshot.json``
+    and the journal moves to a new segment, so recovery reads one snapshot
+    and at most one short segment.
+
+    The directory is locked for the journal's lifetime; a second process
+    opening it gets OSError instead of recovering a live session."""
+
+    def __init__(self, directory, snapshot_every=1000, max_entries=500, fsync=True):
+        self.directory = directory
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self._queue = queue.Queue()
+        self._thread = None
+        self._file = None
+        self._segment = 1
+        self._since_snapshot = 0
+        # Mirror of what has been written, used to build snapshots off the hot path
+        self._state = {}
+        self._conversation = deque(maxlen=max_entries)
+        self._last_seq = 0
+        self._epoch = None
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, LOCK_FILE), 'w')
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise OSError(f"journal {directory} is in use by another process")
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"journal-{segment:06d}.jsonl")
+
+    def _segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith('journal-') and name.endswith('.jsonl'):
+                try:
+                    segments.append(int(name[8:-6]))
+                except ValueError:
+                    continue
+        return sorted(segments)
+
+    def recover(self):
+        """Load the latest snapshot and replay newer records.
+
+        Returns None when there is nothing to recover, else a dict with
+        ``state``, ``conversation`` (the retained entries), ``last_seq``
+        and ``epoch``."""
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        found = False
+        if os.path.exists(snapshot_path):
+            try:
+                with open(snapshot_path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                self._state = snapshot['state']
+                self._conversation.extend(snapshot['conversation'])
+                self._last_seq = snapshot['last_seq']
+                self._epoch = snapshot.get('epoch')
+                self._segment = snapshot['segment']
+                found = True
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Ignoring unreadable journal snapshot: {e}")
+
+        replayed = 0
+        for segment in self._segments():
+            if segment < self._segment:
+                continue
+            with open(self._segment_path(segment), 'rb+') as f:
+                good = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write from a crash; cut it so new records start on a clean line
+                        logger.warning(f"Dropping partial journal record in segment {segment}")
+                        f.truncate(good)
+                        break
+                    self._apply(record)
+                    replayed += 1
+                    good += len(line)
+            self._segment = segment
+        self._since_snapshot = replayed
+
+        if not found and replayed == 0:
+            return None
+        logger.info(f"📼 Recovered session: {self._last_seq} conversation entries, {replayed} records replayed")
+        return {
+            'state': dict(self._state),
+            'conversation': list(self._conversation),
+            'last_seq': self._last_seq,
+            'epoch': self._epoch
+        }
+
+    def start(self, epoch=None):
+        """Start the writer thread; pending records are flushed at exit"""
+        if epoch is not None:
+            self._epoch = epoch
+        self._file = open(self._segment_path(self._segment), 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, op, data):
+        """Queue a record: ('state', {field: value}) or ('append', entry)"""
+        self._queue.put({'op': op, 'data': data})
+
+    def flush(self, timeout=None):
+        """Block until everything queued so far is on disk"""
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        """Stop the writer and leave a snapshot for the next start"""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        self._thread = None
+        # Released with the file
+        self._lock_file.close()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Group commit: take whatever else is already waiting
+            while len(batch) < 1024:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = False
+            waiters = []
+            records = []
+            for item in batch:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    waiters.append(item)
+                else:
+                    records.append(item)
+            try:
+                self._write(records)
+                if stop or self._since_snapshot >= self.snapshot_every:
+                    self._snapshot()
+            except Exception as e:
+                logger.error(f"Journal write failed: {e}")
+            for waiter in waiters:
+                waiter.set()
+            if stop:
+                self._file.close()
+                return
+
+    def _write(self, records):
+        if not records:
+            return
+        self._file.write(''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in records))
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        for record in records:
+            self._apply(record)
+        self._since_snapshot += len(records)
+
+    def _apply(self, record):
+        if record['op'] == 'state':
+            self._state.update(record['data'])
+        elif record['op'] == 'append':
+            self._conversation.append(record['data'])
+            self._last_seq = max(self._last_seq, record['data']['seq'])
+
+    def _snapshot(self):
+        """Write the mirror atomically, then start a fresh segment"""
+        self._file.close()
+        next_segment = self._segment + 1
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'state': self._state,
+                'conversation': list(self._conversation),
+                'last_seq': self._last_seq,
+                'epoch': self._epoch,
+                'segment': next_segment
+            }, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        for segment in self._segments():
+            if segment < next_segment:
+                os.remove(self._segment_path(segment))
+        self._segment = next_segment
+        self._since_snapshot = 0
+        self._file = open(self._segment_path(self._segment), 'a', encoding='utf-8')
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Speculative Response Generation
+Builds candidate responses from partial transcripts while the interviewer
+is still speaking, then commits the matching candidate (or builds fresh)
+when the final transcript lands
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeResponder:
+    """Candidate responses keyed by phrase and by how a question was classified.
+
+    ``classify(text)`` returns ``(key, context)`` where ``key`` captures
+    everything the response depends on; ``build(text, context)`` makes the
+    response. Because equal keys give equal responses, a candidate built
+    from a partial is committed whenever the final transcript classifies to
+    the same key. Up to ``max_candidates`` are kept per phrase, since the
+    classification can change as words arrive; committing a phrase drops
+    only its own candidates, so partials of the next phrase that arrived
+    meanwhile survive. At most ``max_phrases`` phrases are held, oldest
+    evicted first, for phrases whose final transcript never comes."""
+
+    def __init__(self, classify, build, max_candidates=4, max_phrases=4):
+        self.classify = classify
+        self.build = build
+        self.max_candidates = max_candidates
+        self.max_phrases = max_phrases
+        # phrase id -> OrderedDict(key -> response)
+        self._phrases = OrderedDict()
+        self._lock = threading.Lock()
+        self.speculated = 0
+        self.hits = 0
+        self.misses = 0
+        self.unspeculated = 0
+        self._build_seconds = 0.0
+        self._builds = 0
+
+    def _timed_build(self, text, context):
+        started = time.perf_counter()
+        response = self.build(text, context)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._build_seconds += elapsed
+            self._builds += 1
+        return response
+
+    def speculate(self, text, phrase_id=None):
+        """Pre-build the response for a partial transcript of ``phrase_id``
+        unless that phrase already has one for its key"""
+        key, context = self.classify(text)
+        with self._lock:
+            candidates = self._phrases.get(phrase_id)
+            if candidates is not None and key in candidates:
+                candidates.move_to_end(key)
+                return False
+        response = self._timed_build(text, context)
+        with self._lock:
+            candidates = self._phrases.get(phrase_id)
+            if candidates is None:
+                candidates = self._phrases[phrase_id] = OrderedDict()
+                while len(self._phrases) > self.max_phrases:
+                    self._phrases.popitem(last=False)
+            candidates[key] = response
+            while len(candidates) > self.max_candidates:
+                candidates.popitem(last=False)
+            self.speculated += 1
+        return True
+
+    def respond(self, text, phrase_id=None):
+        """Response for the final transcript of ``phrase_id``; commits a
+        matching candidate and discards the rest of that phrase's"""
+        key, context = self.classify(text)
+        with self._lock:
+            candidates = self._phrases.pop(phrase_id, None) or {}
+            speculated = bool(candidates)
+            response = candidates.get(key)
+            if response is not None:
+                self.hits += 1
+            elif speculated:
+                self.misses += 1
+            else:
+                self.unspeculated += 1
+        if response is not None:
+            logger.debug(f"Speculative response committed for: {text[:50]}")
+            return response
+        return self._timed_build(text, context)
+
+    def get_stats(self):
+        with self._lock:
+            attempted = self.hits + self.misses
+            return {
+                'speculated': self.speculated,
+                'hits': self.hits,
+                'misses': self.misses,
+                'unspeculated': self.unspeculated,
+                'hit_rate': round(self.hits / attempted, 3) if attempted else None,
+                'avg_build_ms': round(self._build_seconds / self._builds * 1000, 3) if self._builds else 0.0,
+                'pending_candidates': sum(len(candidates) for candidates in self._phrases.values())
+            }
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Speech Recognition Backends
+One transcribe(audio) interface over Google's web recognizer, a local
+CPU Whisper model and a scripted stand-in, chosen with the SPEECH_BACKEND
+environment variable
+"""
+import logging
+import os
+import threading
+try:
+    import speech_recognition as sr
+except Exception:
+    sr = None
+try:
+    import numpy as np
+except Exception:
+    np = None
+try:
+    from transformers import pipeline as hf_pipeline  # type: ignore
+except Exception:
+    hf_pipeline = None
+from audio_sources import ScriptedSpeechBackend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WHISPER_SAMPLE_RATE = 16000
+
+# Loaded models, shared by every platform instance in the process
+_models = {}
+_models_lock = threading.Lock()
+
+
+class GoogleSpeechBackend:
+    """Google Web Speech API through SpeechRecognition (needs internet)"""
+
+    name = 'google'
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+
+    def warm(self):
+        return True
+
+    def transcribe(self, audio):
+        """Text for an sr.AudioData phrase, or '' when nothing was understood"""
+        try:
+            return self.recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ''
+
+
+class WhisperSpeechBackend:
+    """Local Whisper model on CPU via transformers; loaded once, then kept warm"""
+
+    name = 'whisper'
+
+    def __init__(self, model_name=None):
+        self.model_name = model_name or os.getenv('WHISPER_MODEL', 'openai/whisper-tiny.en')
+
+    @staticmethod
+    def available():
+        return hf_pipeline is not None and np is not None
+
+    def _model(self):
+        model = _models.get(self.model_name)
+        if model is not None:
+            return model
+        with _models_lock:
+            model = _models.get(self.model_name)
+            if model is None:
+                logger.info(f"Loading speech model {self.model_name} on CPU...")
+                model = hf_pipeline('automatic-speech-recognition', model=self.model_name, device=-1)
+                # The first inference pays for kernel setup; do it now, not on the first question
+                model({'raw': np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), 'sampling_rate': WHISPER_SAMPLE_RATE})
+                _models[self.model_name] = model
+                logger.info(f"✅ Speech model {self.model_name} ready")
+        return model
+
+    def warm(self):
+        """Load the model ahead of the first phrase; False if that failed"""
+        try:
+            self._model()
+            return True
+        except Exception as e:
+            logger.error(f"Could not load speech model {self.model_name}: {e}")
+            return False
+
+    def transcribe(self, audio):
+        """Text for an sr.AudioData phrase, or '' when nothing was understood"""
+        pcm = audio.get_raw_data(convert_rate=WHISPER_SAMPLE_RATE, convert_width=2)
+        samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+        if samples.size == 0:
+            return ''
+        result = self._model()({'raw': samples, 'sampling_rate': WHISPER_SAMPLE_RATE})
+        return result.get('text', '').strip()
+
+
+def get_speech_backend(recognizer=None, name=None):
+    """Backend named by ``name`` or SPEECH_BACKEND (google|whisper|scripted).
+
+    Falls back to Google when the local model's dependencies are missing.
+    ``scripted`` replays SPEECH_SCRIPT (one transcript per line) for
+    mic-free test runs."""
+    name = (name or os.getenv('SPEECH_BACKEND', 'google')).lower()
+    if name == 'scripted':
+        latency = float(os.getenv('SPEECH_SCRIPT_LATENCY', '0'))
+        script_path = os.getenv('SPEECH_SCRIPT')
+        if script_path:
+            return ScriptedSpeechBackend.from_file(script_path, latency)
+        return ScriptedSpeechBackend(latency=latency)
+    if name == 'whisper':
+        if WhisperSpeechBackend.available():
+            return WhisperSpeechBackend()
+        logger.warning("SPEECH_BACKEND=whisper needs transformers, torch and numpy; using Google")
+    elif name != 'google':
+        logger.warning(f"Unknown SPEECH_BACKEND '{name}'; using Google")
+    return GoogleSpeechBackend(recognizer)
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Speech Pipeline
+Decouples audio capture from recognition: captured phrases go into a bounded
+queue drained by a small worker pool, and transcripts are delivered in the
+order the phrases were spoken
+"""
+import logging
+import os
+import queue
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class SpeechPipeline:
+    """Producer/consumer recognition pipeline.
+
+    The listening loop calls ``submit(audio)`` and goes straight back to
+    listening. ``workers`` threads run ``recognize(audio)`` (a network round
+    trip for Google) and hand transcripts to ``on_text`` strictly in
+    submission order. When the queue is full the oldest waiting phrase is
+    dropped, so a slow recognizer costs stale audio, never listening time.
+    With a ``tracker`` (LatencyTracker), each ``on_text`` call runs inside a
+    trace started from the phrase's capture and recognition times. With
+    ``phrase_ids``, ``on_text(text, phrase_id)`` also gets the id the
+    segmenter tagged the audio with (None when untagged)."""
+
+    def __init__(self, recognize, on_text, audio_queue=None, workers=None, ignore=(), tracker=None, phrase_ids=False):
+        self.recognize = recognize
+        self.on_text = on_text
+        self.tracker = tracker
+        self.phrase_ids = phrase_ids
+        if audio_queue is None:
+            audio_queue = queue.Queue(maxsize=int(os.getenv('SPEECH_QUEUE_SIZE', '8')))
+        self.queue = audio_queue
+        self.workers = workers or int(os.getenv('SPEECH_WORKERS', '2'))
+        # Exceptions meaning "no speech in this audio" rather than a failure
+        self.ignore = tuple(ignore)
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._submit_lock = threading.Lock()
+        self._results_lock = threading.Lock()
+        # Serializes on_text so transcripts are handled one at a time, in order
+        self._deliver_lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._next_submit = 0
+        self._next_deliver = 0
+        self._results = {}
+        self.metrics = {
+            'submitted': 0,
+            'dropped': 0,
+            'recognized': 0,
+            'no_speech': 0,
+            'errors': 0,
+            'max_queue_depth': 0,
+            'total_queue_wait': 0.0,
+            'total_recognition_time': 0.0
+        }
+
+    def start(self):
+        """Start the worker pool once; workers idle on the queue between sessions"""
+        with self._start_lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f"speech-worker-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, audio):
+        """Queue a captured phrase without blocking the capture thread"""
+        self.start()
+        with self._submit_lock:
+            seq = self._next_submit
+            self._next_submit += 1
+            item = (seq, time.monotonic(), audio)
+            while True:
+                try:
+                    self.queue.put_nowait(item)
+                    break
+                except queue.Full:
+                    try:
+                        stale = self.queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                    # Skipped in order; the worker that finishes a later phrase delivers past it
+                    with self._results_lock:
+                        self._results[stale[0]] = None
+                    self._count('dropped')
+                    logger.warning("Recognition backlog full; dropped oldest phrase")
+            depth = self.queue.qsize()
+        with self._metrics_lock:
+            self.metrics['submitted'] += 1
+            self.metrics['max_queue_depth'] = max(self.metrics['max_queue_depth'], depth)
+        return seq
+
+    def _worker(self):
+        while True:
+            seq, queued_at, audio = self.queue.get()
+            started = time.monotonic()
+            text = None
+            try:
+                text = self.recognize(audio)
+                self._count('recognized' if text else 'no_speech')
+            except self.ignore:
+                self._count('no_speech')
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Speech recognition error: {e}")
+            finished = time.monotonic()
+            with self._metrics_lock:
+                self.metrics['total_queue_wait'] += started - queued_at
+                self.metrics['total_recognition_time'] += finished - started
+            self._deliver(seq, text, (queued_at, started, finished), getattr(audio, 'phrase_id', None))
+
+    def _deliver(self, seq, text, timing, phrase_id=None):
+        """Release every consecutive finished result, oldest first"""
+        with self._results_lock:
+            self._results[seq] = (text, timing, phrase_id) if text else None
+        with self._deliver_lock:
+            while True:
+                with self._results_lock:
+                    if self._next_deliver not in self._results:
+                        return
+                    ready = self._results.pop(self._next_deliver)
+                    self._next_deliver += 1
+                if not ready:
+                    continue
+                text, (queued_at, started, finished), phrase_id = ready
+                if self.tracker is not None:
+                    self.tracker.begin(captured=queued_at, asr_start=started, asr_end=finished)
+                try:
+                    if self.phrase_ids:
+                        self.on_text(text, phrase_id)
+                    else:
+                        self.on_text(text)
+                except Exception as e:
+                    logger.error(f"Error handling transcript: {e}")
+
+    def _count(self, key):
+        with self._metrics_lock:
+            self.metrics[key] += 1
+
+    def get_metrics(self):
+        """Counters plus current depth and mean wait/recognition times (ms)"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        processed = metrics['recognized'] + metrics['no_speech'] + metrics['errors']
+        total_wait = metrics.pop('total_queue_wait')
+        total_recognition = metrics.pop('total_recognition_time')
+        metrics.update({
+            'workers': self.workers,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'avg_queue_wait_ms': round(1000 * total_wait / processed, 2) if processed else 0.0,
+            'avg_recognition_ms': round(1000 * total_recognition / processed, 2) if processed else 0.0
+        })
+        return metrics
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Streaming Speech Segmentation
+Splits the live capture buffer into phrases and, while a phrase is still
+being spoken, hands out interim audio so partial transcripts can be shown
+before the speaker finishes
+"""
+import itertools
+import logging
+import threading
+from collections import deque
+try:
+    import speech_recognition as sr
+except Exception:
+    sr = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StreamingSegmenter:
+    """Phrase endpointing over a BufferedSource with interim snapshots.
+
+    Phrase boundaries come from a ``VoiceActivityDetector``; a short
+    pre-roll is kept so the first word survives onset detection. While a
+    phrase is voiced, the audio so far is passed to
+    ``on_partial(phrase_id, audio)`` every ``partial_interval`` seconds
+    (skipped when ``on_partial`` is None); the finished phrase goes to
+    ``on_phrase(phrase_id, audio)``. Phrase ids come from ``phrase_ids``;
+    pass one shared iterator to every segmenter whose phrases reach the
+    same consumers so ids never repeat across listening sessions."""
+
+    def __init__(self, source, vad, partial_interval=0.5, preroll=0.5, phrase_ids=None):
+        self.source = source
+        self.vad = vad
+        self.partial_interval = partial_interval
+        self.chunk_seconds = source.CHUNK / source.SAMPLE_RATE
+        self.preroll_frames = max(1, int(preroll / self.chunk_seconds))
+        self.phrase_ids = phrase_ids if phrase_ids is not None else itertools.count(1)
+        self.phrase_id = 0
+
+    def _audio(self, frames):
+        audio = sr.AudioData(b''.join(frames), self.source.SAMPLE_RATE, self.source.SAMPLE_WIDTH)
+        # Lets scripted recognizers pair each phrase with its transcript
+        audio.phrase_id = self.phrase_id
+        return audio
+
+    def run(self, should_continue, on_partial, on_phrase):
+        """Segment until ``should_continue()`` is false or the source ends"""
+        preroll = deque(maxlen=self.preroll_frames)
+        frames = None
+        since_partial = 0.0
+        while should_continue():
+            frame = self.source.stream.read(self.source.CHUNK)
+            if not frame:
+                break
+            event = self.vad.update(frame)
+            if frames is None:
+                preroll.append(frame)
+                if event == 'start':
+                    self.phrase_id = next(self.phrase_ids)
+                    frames = list(preroll)
+                    preroll.clear()
+                    since_partial = 0.0
+                continue
+
+            frames.append(frame)
+            if event == 'end':
+                on_phrase(self.phrase_id, self._audio(frames))
+                frames = None
+                continue
+            since_partial += self.chunk_seconds
+            if on_partial is not None and since_partial >= self.partial_interval and self.vad.voiced:
+                since_partial = 0.0
+                on_partial(self.phrase_id, self._audio(frames))
+
+
+class PartialTranscriber:
+    """Transcribes interim audio on one background thread, latest first.
+
+    Only the newest pending snapshot is kept, so a slow recognizer skips
+    stale partials instead of falling behind; partials for a phrase that
+    has already been finalized are discarded. ``on_partial(text, phrase_id)``
+    receives each interim transcript."""
+
+    def __init__(self, transcribe, on_partial):
+        self.transcribe = transcribe
+        self.on_partial = on_partial
+        self._pending = None
+        self._finished_id = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def offer(self, phrase_id, audio):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._pending = (phrase_id, audio)
+            self._cond.notify()
+
+    def finish(self, phrase_id):
+        """The final transcript for ``phrase_id`` is on its way; stop partials for it"""
+        with self._cond:
+            self._finished_id = max(self._finished_id, phrase_id)
+            if self._pending is not None and self._pending[0] <= phrase_id:
+                self._pending = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                phrase_id, audio = self._pending
+                self._pending = None
+            try:
+                text = self.transcribe(audio)
+            except Exception as e:
+                logger.debug(f"Partial recognition failed: {e}")
+                continue
+            with self._cond:
+                stale = phrase_id <= self._finished_id
+            if text and not stale:
+                self.on_partial(text, phrase_id)
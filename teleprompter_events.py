@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Teleprompter Event Broker
+Fans out question/response/status updates to Server-Sent Events and
+WebSocket clients
+"""
+import json
+import threading
+import time
+from collections import deque
+
+
+class EventBroker:
+    """Thread-safe publish/subscribe buffer of recent teleprompter events"""
+
+    def __init__(self, history_size=256, heartbeat_interval=15.0, retry_ms=3000):
+        self.heartbeat_interval = heartbeat_interval
+        self.retry_ms = retry_ms
+        self._events = deque(maxlen=history_size)
+        self._last_id = 0
+        self._cond = threading.Condition()
+        self._listeners = []
+        # Optional on_delivered(event, payload), called once a client has been sent an event
+        self.on_delivered = None
+
+    @property
+    def last_id(self):
+        """Id of the most recently published event (0 when none)"""
+        return self._last_id
+
+    def publish(self, event, data):
+        """Publish an event to every connected client and return its id"""
+        payload = json.dumps(data)
+        with self._cond:
+            self._last_id += 1
+            event_id = self._last_id
+            self._events.append((event_id, event, payload))
+            self._cond.notify_all()
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(event_id, event, payload)
+        return event_id
+
+    def subscribe(self, listener):
+        """Register listener(event_id, event, payload), called on every publish.
+        Listeners run on the publishing thread and must not block.
+        Returns a callable that removes the listener."""
+        with self._cond:
+            self._listeners.append(listener)
+
+        def unsubscribe():
+            with self._cond:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+        return unsubscribe
+
+    def events_since(self, last_id):
+        """Return buffered events newer than last_id.
+
+        The second value is False when the client fell further behind than
+        the buffer reaches and must re-sync from a full snapshot."""
+        with self._cond:
+            if last_id > self._last_id:
+                # Id from another process or a previous run: resync
+                return [], False
+            if last_id == self._last_id:
+                return [], True
+            oldest = self._events[0][0] if self._events else self._last_id + 1
+            complete = last_id >= oldest - 1
+            return [e for e in self._events if e[0] > last_id], complete
+
+    def wait_for_events(self, last_id, timeout):
+        """Block until an event newer than last_id exists or timeout expires"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._last_id > last_id, timeout=timeout)
+        return self.events_since(last_id)
+
+    def stream(self, last_id=None, snapshot=None, max_duration=300.0):
+        """Yield Server-Sent Events text for one client connection.
+
+        ``snapshot`` is a callable returning (event, data) pairs describing
+        the current state; it is sent on first connect and whenever the
+        client's Last-Event-ID has already been evicted from the buffer.
+        The stream closes after ``max_duration`` so the browser reconnects
+        and proxies/worker threads are recycled."""
+        deadline = time.monotonic() + max_duration
+        yield f"retry: {self.retry_ms}\n\n"
+
+        if last_id is None or last_id > self._last_id:
+            last_id = self._last_id
+            if snapshot is not None:
+                for event, data in snapshot():
+                    payload = json.dumps(data)
+                    yield self.format_event(last_id, event, payload)
+                    self.delivered(event, payload)
+
+        while time.monotonic() < deadline:
+            events, complete = self.wait_for_events(last_id, self.heartbeat_interval)
+            if not complete and snapshot is not None:
+                resync_id = events[-1][0] if events else self._last_id
+                for event, data in snapshot():
+                    payload = json.dumps(data)
+                    yield self.format_event(resync_id, event, payload)
+                    self.delivered(event, payload)
+                last_id = resync_id
+                continue
+            if not events:
+                # Comment line keeps idle connections open through proxies
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, event, payload in events:
+                yield self.format_event(event_id, event, payload)
+                self.delivered(event, payload)
+                last_id = event_id
+
+    def delivered(self, event, payload):
+        """Report that a transport handed an event to a client"""
+        if self.on_delivered is not None:
+            self.on_delivered(event, payload)
+
+    @staticmethod
+    def format_event(event_id, event, payload):
+        """Format a single Server-Sent Events message"""
+        return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+    @staticmethod
+    def parse_last_event_id(value):
+        """Parse a Last-Event-ID header/query value, returning None if absent"""
+        try:
+            return int(value) if value not in (None, '') else None
+        except (TypeError, ValueError):
+            return None
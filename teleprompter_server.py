@@ -5,6 +5,7 @@ Provides API endpoints for teleprompter functionality
 """
 from flask import Flask, jsonify, request, render_template_string
 from teleprompter_integration import get_teleprompter
+from conversation_store import conversation_response
 import logging
 
 # Configure logging
@@ -202,20 +203,32 @@ def index():
             document.getElementById('currentResponse').textContent = response || 'Waiting for response...';
         }
         
-        function updateConversationHistory(history) {
+        // Cursor into the server's conversation sequence; only newer entries are fetched
+        let conversationSince = 0;
+        // Store epoch the cursor belongs to; a new one means a restarted server
+        let conversationEpoch = null;
+        
+        function appendConversationHistory(page) {
             const container = document.getElementById('conversationHistory');
-            if (!history || history.length === 0) {
+            // A new epoch, or a sequence behind our cursor, means the server restarted with a fresh history
+            const restarted = (conversationEpoch !== null && page.epoch !== conversationEpoch) || page.last_seq < conversationSince;
+            conversationEpoch = page.epoch;
+            if (restarted) {
+                conversationSince = 0;
                 container.innerHTML = 'No conversation yet...';
                 return;
             }
+            if (!page.entries || page.entries.length === 0) return;
+            if (conversationSince === 0) container.innerHTML = '';
             
-            container.innerHTML = history.map(item => `
+            container.insertAdjacentHTML('beforeend', page.entries.map(item => `
                 <div class="conversation-item ${item.speaker}">
                     <strong>${item.speaker === 'interviewer' ? '🎤 Interviewer' : '🤖 AI Assistant'}:</strong>
                     <div>${item.text}</div>
                     <div class="timestamp">${new Date(item.timestamp).toLocaleTimeString()}</div>
                 </div>
-            `).join('');
+            `).join(''));
+            conversationSince = page.next_since;
             
             container.scrollTop = container.scrollHeight;
         }
@@ -232,10 +245,9 @@ def index():
                     updateStatus('Connected - AI Response Generation Active');
                 }
                 
-                // Fetch conversation history
-                const historyResponse = await fetch('/api/conversation');
-                const historyData = await historyResponse.json();
-                updateConversationHistory(historyData);
+                // Fetch only conversation entries added since the last poll
+                const historyResponse = await fetch(`/api/conversation?since=${conversationSince}`);
+                appendConversationHistory(await historyResponse.json());
                 
                 // Fetch status
                 const statusResponse = await fetch('/api/status');
@@ -285,9 +297,9 @@ def get_status():
 
 @app.route('/api/conversation')
 def get_conversation():
-    """Get conversation history"""
+    """Get conversation history; supports ?since=<seq>&limit=N and If-None-Match"""
     teleprompter = get_teleprompter()
-    return jsonify(teleprompter.get_conversation())
+    return conversation_response(teleprompter.get_conversation())
 
 @app.route('/api/response')
 def get_current_response():
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+Teleprompter State
+Pluggable session state stores (in-memory, or SQLite shared between worker
+processes), plus snapshots that serialize polled endpoint payloads once per
+state change and a faster Flask JSON provider when orjson is installed
+"""
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+try:
+    import fcntl
+except Exception:
+    # No cross-process locking (Windows): recovery cannot be told apart from a worker joining
+    fcntl = None
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+from conversation_store import ConversationStore
+from session_journal import SessionJournal
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def dumps_bytes(obj):
+    """Serialize to UTF-8 JSON bytes with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that uses orjson for plain dumps/loads"""
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # Types orjson does not know (e.g. Decimal) go through Flask's defaults
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+class SnapshotCache:
+    """JSON bodies for polled endpoints, rebuilt at most once per state version.
+
+    Every mutation of the underlying state calls ``bump()``; the next request
+    for a snapshot re-serializes it once and all other requests for the same
+    version are served the cached bytes, with an ETag clients can revalidate.
+    Passing a state store's ``epoch`` and its versions to ``bump()`` makes the
+    ETags agree between every worker sharing that store."""
+
+    def __init__(self, epoch=None):
+        self._version = 0
+        self._builders = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+        # Keeps ETags from matching across restarts that reuse version numbers
+        self.epoch = epoch or uuid.uuid4().hex[:8]
+
+    @property
+    def version(self):
+        return self._version
+
+    def register(self, name, builder):
+        """Register a zero-argument callable producing the payload for ``name``"""
+        self._builders[name] = builder
+
+    def bump(self, version=None):
+        """Mark the state as changed; cached bodies become stale"""
+        with self._lock:
+            self._version = self._version + 1 if version is None else version
+            return self._version
+
+    def get(self, name):
+        """Return (body_bytes, etag) for the current state version"""
+        version = self._version
+        cached = self._cache.get(name)
+        if cached is not None and cached[0] == version:
+            return cached[1], cached[2]
+        with self._lock:
+            cached = self._cache.get(name)
+            if cached is not None and cached[0] == self._version:
+                return cached[1], cached[2]
+            version = self._version
+            body = dumps_bytes(self._builders[name]())
+            etag = f"{name}-{self.epoch}-{version}"
+            self._cache[name] = (version, body, etag)
+            return body, etag
+
+    def response(self, name):
+        """Flask response serving the cached body, or 304 when unchanged"""
+        body, etag = self.get(name)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+# Fields shared between every process serving the same teleprompter session
+DEFAULT_STATE = {
+    'is_listening': False,
+    'current_question': '',
+    'last_response': '',
+    'response_version': 0,
+    'response_timestamp': None
+}
+
+
+class InMemoryStateStore:
+    """State store for single-process mode (local runs, the dev server).
+
+    With a ``SessionJournal`` the state and conversation are recovered from
+    it on construction and every later change is journaled."""
+
+    shared = False
+
+    def __init__(self, journal=None):
+        self._state = dict(DEFAULT_STATE)
+        self._changes = 0
+        # The change counter restarts with the process even when the journal
+        # restores the conversation, so its versions are only unique per process
+        self.epoch = uuid.uuid4().hex[:8]
+        self._lock = threading.Lock()
+        self.conversation = ConversationStore()
+        self.journal = journal
+        if journal is not None:
+            recovered = journal.recover()
+            if recovered:
+                self._state.update(recovered['state'])
+                self.conversation.restore(recovered['conversation'], recovered['last_seq'], recovered['epoch'])
+            # Listening needs a live audio loop, which a restart does not bring back
+            self._state['is_listening'] = False
+            journal.start(self.conversation.epoch)
+            self.conversation.on_append = lambda entry: journal.record('append', entry)
+
+    @property
+    def version(self):
+        """Monotonic change counter covering state fields and conversation"""
+        return self._changes + self.conversation.last_seq
+
+    def get(self, key):
+        return self._state[key]
+
+    def get_all(self):
+        return dict(self._state)
+
+    def update(self, **fields):
+        with self._lock:
+            self._state.update(fields)
+            self._changes += 1
+            self._journal(fields)
+
+    def publish_response(self, question, response, timestamp):
+        """Atomically make a response current; returns its version"""
+        with self._lock:
+            self._state['current_question'] = question
+            self._state['last_response'] = response
+            self._state['response_timestamp'] = timestamp
+            self._state['response_version'] += 1
+            self._changes += 1
+            self._journal({
+                'current_question': question, 'last_response': response,
+                'response_timestamp': timestamp, 'response_version': self._state['response_version']
+            })
+            return self._state['response_version']
+
+    def _journal(self, fields):
+        if self.journal is not None:
+            self.journal.record('state', dict(fields))
+
+    def watch(self, callback, interval=0.05):
+        """Changes only come from this process, which syncs directly"""
+        return None
+
+
+class SQLiteStateStore:
+    """State store shared by every worker process on the host.
+
+    Uses one SQLite database in WAL mode so readers never block the writer.
+    A watcher thread per process notices commits from other workers via
+    ``PRAGMA data_version`` and calls back so local caches, event streams
+    and long polls stay in step.
+
+    The first process to open the database after every user has exited is
+    recovering the session and, like the in-memory store, clears
+    ``is_listening``; workers joining a live session leave it alone."""
+
+    shared = True
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        recovering = self._join_session()
+        with _Transaction(self._conn()) as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL, epoch TEXT NOT NULL)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversation ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, speaker TEXT NOT NULL, "
+                "text TEXT NOT NULL, timestamp TEXT NOT NULL)"
+            )
+            # Entries beyond CONVERSATION_MAX_ENTRIES, still reachable by cursor reads
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_archive ("
+                "seq INTEGER PRIMARY KEY, speaker TEXT NOT NULL, text TEXT NOT NULL, timestamp TEXT NOT NULL)"
+            )
+            conn.execute("INSERT OR IGNORE INTO meta (id, version, epoch) VALUES (1, 0, ?)", (uuid.uuid4().hex[:8],))
+            conn.executemany(
+                "INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in DEFAULT_STATE.items()]
+            )
+        if recovering:
+            # Listening needs a live audio loop, which a restart does not bring back
+            self.update(is_listening=False)
+        self.epoch = self._conn().execute("SELECT epoch FROM meta WHERE id = 1").fetchone()[0]
+        self.conversation = SQLiteConversationStore(self)
+
+    def _join_session(self):
+        """Hold a shared lock on ``<path>.lock`` while this process uses the
+        database; True when no other process held it"""
+        if fcntl is None or self.path == ':memory:':
+            return False
+        self._session_lock = open(self.path + '.lock', 'w')
+        try:
+            fcntl.flock(self._session_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            alone = True
+        except OSError:
+            alone = False
+        fcntl.flock(self._session_lock, fcntl.LOCK_SH)
+        return alone
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _conn(self):
+        """Per-thread connection (sqlite3 connections are not thread-safe)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def transaction(self):
+        """Write transaction that also bumps the shared change counter"""
+        return _Transaction(self._conn(), bump_version=True)
+
+    @property
+    def version(self):
+        return self._conn().execute("SELECT version FROM meta WHERE id = 1").fetchone()[0]
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else DEFAULT_STATE[key]
+
+    def get_all(self):
+        state = dict(DEFAULT_STATE)
+        for key, value in self._conn().execute("SELECT key, value FROM state"):
+            state[key] = json.loads(value)
+        return state
+
+    def update(self, **fields):
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in fields.items()]
+            )
+
+    def publish_response(self, question, response, timestamp):
+        with self.transaction() as conn:
+            row = conn.execute("SELECT value FROM state WHERE key = 'response_version'").fetchone()
+            version = (json.loads(row[0]) if row else 0) + 1
+            conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                [(k, json.dumps(v)) for k, v in (
+                    ('current_question', question), ('last_response', response),
+                    ('response_timestamp', timestamp), ('response_version', version)
+                )]
+            )
+        return version
+
+    def watch(self, callback, interval=0.05):
+        """Call ``callback()`` whenever another connection commits"""
+        def run():
+            conn = self._connect()
+            seen = conn.execute("PRAGMA data_version").fetchone()[0]
+            while True:
+                time.sleep(interval)
+                current = conn.execute("PRAGMA data_version").fetchone()[0]
+                if current != seen:
+                    seen = current
+                    try:
+                        callback()
+                    except Exception as e:
+                        logger.error(f"State sync failed: {e}")
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        return thread
+
+
+class SQLiteConversationStore:
+    """ConversationStore interface over the shared SQLite database.
+
+    Like the in-memory store, only the newest ``max_entries`` are live:
+    older rows move to ``conversation_archive`` in the transaction that
+    appends past the limit, so ``to_list()`` stays bounded while cursor
+    reads still reach the whole session."""
+
+    def __init__(self, store, max_entries=None):
+        self._store = store
+        if max_entries is None:
+            max_entries = int(os.getenv('CONVERSATION_MAX_ENTRIES', '500'))
+        self.max_entries = max(1, max_entries)
+        # A database written before the bound existed, or with a larger one
+        with _Transaction(store._conn()) as conn:
+            last = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM conversation").fetchone()[0]
+            self._archive(conn, last)
+
+    @property
+    def epoch(self):
+        return self._store.epoch
+
+    def _archive(self, conn, last_seq):
+        """Move rows older than the newest ``max_entries`` into the archive"""
+        cutoff = last_seq - self.max_entries
+        if cutoff <= 0:
+            return
+        conn.execute("INSERT OR REPLACE INTO conversation_archive SELECT * FROM conversation WHERE seq <= ?", (cutoff,))
+        conn.execute("DELETE FROM conversation WHERE seq <= ?", (cutoff,))
+
+    def append(self, speaker, text, timestamp=None):
+        timestamp = timestamp or datetime.now().isoformat()
+        with self._store.transaction() as conn:
+            seq = conn.execute(
+                "INSERT INTO conversation (speaker, text, timestamp) VALUES (?, ?, ?)",
+                (speaker, text, timestamp)
+            ).lastrowid
+            self._archive(conn, seq)
+        return {'seq': seq, 'speaker': speaker, 'text': text, 'timestamp': timestamp}
+
+    @property
+    def last_seq(self):
+        return self._store._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM conversation").fetchone()[0]
+
+    @property
+    def etag(self):
+        return f"{self.epoch}-{self.last_seq}"
+
+    def since(self, seq, limit=None):
+        """Entries with ``seq`` greater than the given cursor, oldest first"""
+        rows = self._store._conn().execute(
+            "SELECT seq, speaker, text, timestamp FROM ("
+            "SELECT * FROM conversation_archive WHERE seq > ? UNION ALL "
+            "SELECT * FROM conversation WHERE seq > ?) ORDER BY seq LIMIT ?",
+            (seq, seq, -1 if limit is None else limit)
+        )
+        return [{'seq': r[0], 'speaker': r[1], 'text': r[2], 'timestamp': r[3]} for r in rows]
+
+    def to_list(self):
+        """The newest ``max_entries`` entries"""
+        rows = self._store._conn().execute("SELECT seq, speaker, text, timestamp FROM conversation ORDER BY seq")
+        return [{'seq': r[0], 'speaker': r[1], 'text': r[2], 'timestamp': r[3]} for r in rows]
+
+    def __len__(self):
+        return self._store._conn().execute(
+            "SELECT (SELECT COUNT(*) FROM conversation) + (SELECT COUNT(*) FROM conversation_archive)"
+        ).fetchone()[0]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+
+class _Transaction:
+    """Context manager running an IMMEDIATE transaction on a connection"""
+
+    def __init__(self, conn, bump_version=False):
+        self.conn = conn
+        self.bump_version = bump_version
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            if self.bump_version:
+                self.conn.execute("UPDATE meta SET version = version + 1 WHERE id = 1")
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+def create_state_store():
+    """Pick the state backend from TELEPROMPTER_STATE_BACKEND (memory|sqlite).
+
+    Use sqlite whenever more than one process serves the app (gunicorn -w N);
+    TELEPROMPTER_STATE_PATH selects the database file. The memory backend
+    journals to TELEPROMPTER_JOURNAL_DIR so a restart recovers the session;
+    set it to an empty string to run without a journal. The default journal
+    directory is per PORT, and a directory another process holds is not
+    shared: that process keeps its session and this one runs unjournaled."""
+    backend = os.getenv('TELEPROMPTER_STATE_BACKEND', 'memory').lower()
+    if backend == 'sqlite':
+        path = os.getenv(
+            'TELEPROMPTER_STATE_PATH',
+            os.path.join(tempfile.gettempdir(), 'qwizzy_teleprompter_state.sqlite3')
+        )
+        logger.info(f"Using shared SQLite teleprompter state at {path}")
+        return SQLiteStateStore(path)
+    journal_dir = os.getenv(
+        'TELEPROMPTER_JOURNAL_DIR',
+        os.path.join(tempfile.gettempdir(), f"qwizzy_journal_{os.getenv('PORT', '8000')}")
+    )
+    if not journal_dir:
+        return InMemoryStateStore()
+    try:
+        journal = SessionJournal(
+            journal_dir,
+            snapshot_every=int(os.getenv('TELEPROMPTER_JOURNAL_SNAPSHOT_EVERY', '1000')),
+            max_entries=int(os.getenv('CONVERSATION_MAX_ENTRIES', '500'))
+        )
+    except OSError as e:
+        logger.warning(f"Session journal disabled: {e}")
+        return InMemoryStateStore()
+    return InMemoryStateStore(journal=journal)
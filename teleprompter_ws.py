@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Teleprompter WebSocket Transport
+One bidirectional session per client: control commands in, pushed
+conversation/status events out, with heartbeats and resumable reconnects
+"""
+import asyncio
+import json
+import logging
+import threading
+try:
+    import websockets
+    from websockets.exceptions import ConnectionClosed
+except Exception:
+    websockets = None
+    ConnectionClosed = Exception
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class TeleprompterSocketServer:
+    """Serves a teleprompter platform over WebSockets on its own port.
+
+    Protocol (JSON text frames):
+      client -> {"type": "hello", "last_event_id": 12}
+      client -> {"type": "command", "id": 1, "action": "start_listening"}
+      client -> {"type": "ping"}
+      client -> binary frame: 16 kHz mono int16 PCM from the browser microphone
+      server -> {"type": "event", "id": 13, "event": "response", "data": {...}}
+                (snapshot events carry "snapshot": true and the current id)
+      server -> {"type": "result", "id": 1, "action": "...", "data": {...}}
+      server -> {"type": "pong"} / {"type": "heartbeat"}
+    """
+
+    def __init__(self, platform, host='0.0.0.0', port=8001, heartbeat_interval=15.0):
+        self.platform = platform
+        self.host = host
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.loop = None
+        self.thread = None
+        # Actions map onto the same methods the HTTP routes call
+        self.actions = {
+            'start_listening': platform.start_listening,
+            'stop_listening': platform.stop_listening,
+            'check_microphone': platform.check_microphone_access,
+            'qr': platform.generate_qr_code,
+            'status': platform.get_status_payload,
+        }
+
+    @property
+    def available(self):
+        return websockets is not None
+
+    def start(self):
+        """Start the server on a daemon thread with its own event loop"""
+        if not self.available:
+            logger.info("websockets not installed; WebSocket transport disabled")
+            return False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        return True
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._serve())
+        except Exception as e:
+            logger.error(f"WebSocket server stopped: {e}")
+
+    async def _serve(self):
+        async with websockets.serve(
+            self.handle_client, self.host, self.port,
+            ping_interval=20, ping_timeout=20, max_size=2 ** 20
+        ):
+            logger.info(f"🔌 Teleprompter WebSocket transport on ws://{self.host}:{self.port}")
+            await asyncio.Future()
+
+    async def handle_client(self, websocket, *args):
+        """One session: relay broker events and execute commands until close"""
+        loop = asyncio.get_running_loop()
+        outbox = asyncio.Queue(maxsize=512)
+
+        def on_event(event_id, event, payload):
+            loop.call_soon_threadsafe(self._offer, outbox, (self.format_event(event_id, event, payload), event, payload))
+
+        unsubscribe = self.platform.events.subscribe(on_event)
+        sender = asyncio.ensure_future(self._pump(websocket, outbox))
+        # Binary frames are browser microphone audio; one ingest session per connection
+        audio_session = f"ws{id(websocket):x}"
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    # Spool writes take a file lock; keep them off the loop every session shares
+                    await loop.run_in_executor(None, self.platform.ingest_audio, audio_session, message)
+                    continue
+                try:
+                    request = json.loads(message)
+                except ValueError:
+                    await self._send(websocket, {'type': 'error', 'error': 'invalid JSON'})
+                    continue
+                await self._dispatch(websocket, outbox, request)
+        except ConnectionClosed:
+            pass
+        finally:
+            unsubscribe()
+            sender.cancel()
+
+    async def _dispatch(self, websocket, outbox, request):
+        if not isinstance(request, dict):
+            await self._send(websocket, {'type': 'error', 'error': 'expected a JSON object'})
+            return
+        kind = request.get('type')
+        if kind == 'ping':
+            await self._send(websocket, {'type': 'pong'})
+        elif kind == 'hello':
+            await self._replay(outbox, request.get('last_event_id'))
+        elif kind == 'command':
+            # Run as a task so pings and further commands are not held up
+            asyncio.ensure_future(self._run_command(websocket, request))
+
+    async def _run_command(self, websocket, request):
+        action = self.actions.get(request.get('action'))
+        if action is None:
+            data = {'success': False, 'error': 'Unknown action'}
+        else:
+            # Actions may block (microphone calibration, QR rendering)
+            data = await asyncio.get_running_loop().run_in_executor(None, action)
+        try:
+            await self._send(websocket, {
+                'type': 'result', 'id': request.get('id'), 'action': request.get('action'), 'data': data
+            })
+        except ConnectionClosed:
+            pass
+
+    async def _replay(self, outbox, last_event_id):
+        """Queue missed events for a (re)connecting client, or a fresh snapshot"""
+        broker = self.platform.events
+        # Client input: anything that is not an event id gets a snapshot
+        last_event_id = broker.parse_last_event_id(last_event_id)
+        events, complete = ([], False) if last_event_id is None else broker.events_since(last_event_id)
+        if complete:
+            for item in events:
+                self._offer(outbox, (self.format_event(*item), item[1], item[2]))
+            return
+        snapshot_id = broker.last_id
+        for event, data in self.platform.get_event_snapshot():
+            payload = json.dumps(data)
+            self._offer(outbox, (self.format_event(snapshot_id, event, payload, snapshot=True), event, payload))
+
+    async def _pump(self, websocket, outbox):
+        """Forward queued events; send an app-level heartbeat when idle"""
+        try:
+            while True:
+                try:
+                    message, event, payload = await asyncio.wait_for(outbox.get(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    await self._send(websocket, {'type': 'heartbeat'})
+                    continue
+                await websocket.send(message)
+                self.platform.events.delivered(event, payload)
+        except (ConnectionClosed, asyncio.CancelledError):
+            pass
+
+    @staticmethod
+    def format_event(event_id, event, payload, snapshot=False):
+        """Wrap an already-serialized broker payload without re-encoding it"""
+        flag = ', "snapshot": true' if snapshot else ''
+        return f'{{"type": "event", "id": {event_id}, "event": {json.dumps(event)}{flag}, "data": {payload}}}'
+
+    @staticmethod
+    def _offer(outbox, item):
+        # A client that stops reading loses the oldest events rather than stalling publishers
+        if outbox.full():
+            outbox.get_nowait()
+        outbox.put_nowait(item)
+
+    @staticmethod
+    async def _send(websocket, message):
+        await websocket.send(json.dumps(message))
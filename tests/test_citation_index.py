@@ -0,0 +1,57 @@
+"""Citations picked by the index match the old per-paper keyword lists"""
+import json
+import os
+
+import pytest
+
+from citation_index import CitationIndex, TfidfVectorizer
+
+CURATED = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'references', 'curated.json')
+
+# Questions covering every keyword of the lists the index replaced, with the papers they cited
+KEYWORD_QUESTIONS = [
+    ("What is SLAM?", ['rWifiSLAM-2022']),
+    ("Tell me about federated learning", ['SecureFed-2024', 'QEP-VLA-2025']),
+    ("How do you handle privacy?", ['QEP-VLA-2025']),
+    ("Explain your quantum work", ['QEP-VLA-2025']),
+    ("How does WiFi RTT ranging work?", ['rWifiSLAM-2022']),
+    ("What does 802.11mc give you?", ['rWifiSLAM-2022']),
+    ("How accurate is indoor positioning?", ['rWifiSLAM-2022']),
+    ("How do you localise a phone?", ['rWifiSLAM-2022']),
+    ("How do you detect data poisoning?", ['SecureFed-2024']),
+    ("What about backdoor attacks?", ['SecureFed-2024']),
+    ("How do you find malicious clients?", ['SecureFed-2024']),
+    ("Walk me through SecureFed", ['SecureFed-2024']),
+    ("What is a VLA model?", ['QEP-VLA-2025']),
+    ("Why embodied agents?", ['QEP-VLA-2025']),
+    ("Where does QKD fit in?", ['QEP-VLA-2025']),
+    ("Is homomorphic encryption fast enough?", ['QEP-VLA-2025']),
+    ("Do you use zk proofs?", ['QEP-VLA-2025']),
+]
+
+# Questions none of the keyword lists matched
+UNCITED_QUESTIONS = [
+    "What is your research experience?",
+    "Why do you want this position?",
+    "How do you design real-time systems?",
+    "How do you evaluate accuracy?",
+]
+
+SCORERS = ['bm25'] + (['tfidf'] if TfidfVectorizer is not None else [])
+
+
+@pytest.fixture(scope='module', params=SCORERS)
+def index(request):
+    with open(CURATED, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    return CitationIndex(records, top_k=3, threshold=0, relative_cutoff=0.3, scorer=request.param)
+
+
+@pytest.mark.parametrize('question,expected', KEYWORD_QUESTIONS)
+def test_keyword_questions_cite_the_same_papers(index, question, expected):
+    assert [record_id for record_id, _ in index.search(question)] == expected
+
+
+@pytest.mark.parametrize('question', UNCITED_QUESTIONS)
+def test_unrelated_questions_cite_nothing(index, question):
+    assert index.search(question) == []
@@ -0,0 +1,77 @@
+"""Interim transcripts keep flowing across listening sessions"""
+import itertools
+import threading
+
+from speech_streaming import PartialTranscriber, StreamingSegmenter
+
+FRAME = b'\0\0' * 160
+
+
+class SpokenPhrase:
+    """One phrase of ten frames as an AudioSource stream. Like real speech,
+    the phrase does not end before its interim transcript had time to arrive."""
+
+    SAMPLE_RATE = 16000
+    SAMPLE_WIDTH = 2
+    CHUNK = 160
+
+    def __init__(self, partial_arrived):
+        self.stream = self
+        self.partial_arrived = partial_arrived
+        self.read_frames = 0
+
+    def read(self, size):
+        self.read_frames += 1
+        if self.read_frames == 9:
+            self.partial_arrived.wait(2)
+        return FRAME if self.read_frames <= 12 else b''
+
+
+class ScriptedVAD:
+    """Starts a phrase on the first frame and ends it on the tenth"""
+
+    def __init__(self):
+        self.frames = 0
+        self.voiced = False
+
+    def update(self, frame):
+        self.frames += 1
+        if self.frames == 1:
+            self.voiced = True
+            return 'start'
+        if self.frames == 10:
+            self.voiced = False
+            return 'end'
+        return None
+
+
+def test_second_listening_session_still_gets_partials():
+    partials = []
+    arrived = threading.Event()
+
+    def on_partial(text, phrase_id):
+        partials.append(phrase_id)
+        arrived.set()
+
+    transcriber = PartialTranscriber(lambda audio: 'interim', on_partial)
+    # Shared by every session, as the platform's audio loop does
+    phrase_ids = itertools.count(1)
+    sessions = []
+    for _ in range(2):
+        arrived.clear()
+        finished = []
+
+        def finish_phrase(phrase_id, audio):
+            transcriber.finish(phrase_id)
+            finished.append(phrase_id)
+
+        segmenter = StreamingSegmenter(
+            SpokenPhrase(arrived), ScriptedVAD(), partial_interval=0.02, preroll=0.01, phrase_ids=phrase_ids
+        )
+        segmenter.run(lambda: True, transcriber.offer, finish_phrase)
+        sessions.append(finished)
+
+    first, second = sessions
+    assert first == [1] and second == [2]
+    assert 1 in partials
+    assert 2 in partials
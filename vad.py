@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Voice Activity Detection
+Frame-level speech detection over int16 PCM (energy plus zero-crossing
+rate, vectorized with NumPy) and phrase endpointing with an adaptive
+hangover, replacing SpeechRecognition's fixed listen() timeouts
+"""
+import logging
+import os
+from collections import deque
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """Decides speech/non-speech per 10 ms subframe and tracks phrase boundaries.
+
+    A subframe is speech when its RMS clears ``energy_ratio`` times the
+    running noise floor and its zero-crossing rate looks voiced (very loud
+    subframes pass regardless, so fricatives are kept). The noise floor
+    follows non-speech audio, drops immediately to anything quieter and
+    rises with the quietest subframes of the last ``noise_window`` seconds,
+    so it keeps up when the room gets louder mid-interview. Pass a cached
+    ``noise_floor`` to skip learning it from the first frame; it is
+    reported to ``on_noise_floor(floor)`` between phrases.
+
+    ``update(frame)`` returns 'start' once ``min_speech`` seconds of speech
+    have accumulated, and 'end' after a trailing silence longer than the
+    hangover. The hangover starts at ``hangover_min`` and stretches towards
+    ``hangover_max`` for speakers who pause longer between words, so
+    answers end quickly without cutting questions at a mid-sentence pause."""
+
+    def __init__(self, sample_rate=16000, subframe_ms=10, energy_ratio=None, min_rms=None,
+                 max_zcr=None, min_speech=None, hangover_min=None, hangover_max=None, max_phrase=None,
+                 noise_window=None, noise_floor=None):
+        self.sample_rate = sample_rate
+        self.subframe = max(1, int(sample_rate * subframe_ms / 1000))
+        self.subframe_seconds = self.subframe / sample_rate
+        self.energy_ratio = energy_ratio or float(os.getenv('VAD_ENERGY_RATIO', '3.0'))
+        self.min_rms = min_rms or float(os.getenv('VAD_MIN_RMS', '100'))
+        self.max_zcr = max_zcr or float(os.getenv('VAD_MAX_ZCR', '0.25'))
+        self.min_speech = min_speech or float(os.getenv('VAD_MIN_SPEECH', '0.15'))
+        self.hangover_min = hangover_min or float(os.getenv('VAD_HANGOVER_MIN', '0.3'))
+        self.hangover_max = hangover_max or float(os.getenv('VAD_HANGOVER_MAX', '0.9'))
+        self.max_phrase = max_phrase or float(os.getenv('VAD_MAX_PHRASE', '60'))
+        self.noise_window = noise_window or float(os.getenv('VAD_NOISE_WINDOW', '2.0'))
+        self.noise_floor = noise_floor
+        self.on_noise_floor = None
+        self._minima = None
+        self.in_speech = False
+        self.voiced = False
+        # Typical pause between words, learned across phrases
+        self.pause_average = 0.0
+        self._onset = 0.0
+        self._silence = 0.0
+        self._phrase = 0.0
+
+    def classify(self, frame):
+        """Boolean speech decision for each subframe of an int16 PCM frame"""
+        samples = np.frombuffer(frame, dtype=np.int16)
+        usable = samples.size - samples.size % self.subframe
+        if usable == 0:
+            return np.zeros(0, dtype=bool)
+        blocks = samples[:usable].reshape(-1, self.subframe).astype(np.float32)
+        rms = np.sqrt(np.mean(blocks * blocks, axis=1))
+        signs = np.signbit(blocks)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        if self.noise_floor is None:
+            self.noise_floor = max(float(np.median(rms)), 1.0)
+        threshold = max(self.noise_floor * self.energy_ratio, self.min_rms)
+        speech = (rms > threshold) & ((zcr < self.max_zcr) | (rms > 2 * threshold))
+
+        # Track the floor: follow quiet audio slowly, fall to a quieter level at once
+        quiet = rms[~speech]
+        if quiet.size:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.mean(quiet))
+        self.noise_floor = max(min(self.noise_floor, float(rms.min())), 1.0)
+
+        # Rise towards the quietest recent audio, so a louder room (fan,
+        # traffic) is not taken for one endless phrase
+        if self._minima is None:
+            frames = max(1, int(self.noise_window / (blocks.shape[0] * self.subframe_seconds)))
+            self._minima = deque(maxlen=frames)
+        self._minima.append(float(rms.min()))
+        recent = min(self._minima)
+        if len(self._minima) == self._minima.maxlen and recent > self.noise_floor:
+            self.noise_floor += 0.1 * (recent - self.noise_floor)
+        return speech
+
+    @property
+    def hangover(self):
+        """Trailing silence that ends a phrase for the current speaker"""
+        return min(max(2.0 * self.pause_average, self.hangover_min), self.hangover_max)
+
+    def update(self, frame):
+        """Feed one frame; returns 'start', 'end' or None"""
+        speech = self.classify(frame)
+        duration = speech.size * self.subframe_seconds
+        self.voiced = bool(speech.any())
+
+        if not self.in_speech:
+            if self.on_noise_floor is not None:
+                self.on_noise_floor(self.noise_floor)
+            # Short clicks and bumps never add up to min_speech
+            self._onset = self._onset + float(speech.sum()) * self.subframe_seconds if self.voiced else 0.0
+            if self._onset >= self.min_speech:
+                self.in_speech = True
+                self._onset = 0.0
+                self._silence = 0.0
+                self._phrase = duration
+                return 'start'
+            return None
+
+        self._phrase += duration
+        if self.voiced:
+            spoken = np.flatnonzero(speech)
+            gap = self._silence + spoken[0] * self.subframe_seconds
+            if gap >= 0.08:
+                # A pause between words; learn how long this speaker's pauses are
+                self.pause_average = 0.8 * self.pause_average + 0.2 * gap if self.pause_average else gap
+            self._silence = (speech.size - 1 - spoken[-1]) * self.subframe_seconds
+        else:
+            self._silence += duration
+
+        if self._silence >= self.hangover or self._phrase >= self.max_phrase:
+            self.in_speech = False
+            self._silence = 0.0
+            return 'end'
+        return None
@@ -1,5 +1,7 @@
 import os
 os.environ.setdefault("CLOUD_DEPLOYMENT", "1")
+# gunicorn runs several workers; they must share one teleprompter session
+os.environ.setdefault("TELEPROMPTER_STATE_BACKEND", "sqlite")
 from integrated_main_platform import IntegratedMainPlatform
 
 # Render-specific environment setup